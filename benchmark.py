@@ -0,0 +1,1022 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+番茄钟性能测试脚本
+在无界面模式下测量 PomodoroTimer / PomodoroApp 的关键指标，
+结果可保存为 JSON，用于比较不同提交之间的变化
+
+用法:
+    python benchmark.py                      # 运行全部测试
+    python benchmark.py drift wakeups        # 只运行指定测试
+    python benchmark.py --quick --json a.json
+    python benchmark.py --json b.json --compare a.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+
+class BenchConfig:
+    """不读写配置文件的测试用配置"""
+    def __init__(self, **overrides):
+        self.config = {
+            "work_time": 25,
+            "short_break": 5,
+            "long_break": 15,
+            "cycles": 4,
+            "auto_lock": False
+        }
+        self.config.update(overrides)
+
+class HeadlessMainThread:
+    """代替 PomodoroApp.run() 的主线程：在单独线程中依次执行投递给主线程的界面操作"""
+    def __init__(self, requests):
+        self._requests = requests
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            func = self._requests.get()
+            if func is None:
+                return
+            func()
+
+    def stop(self):
+        self._requests.put(None)
+        self._thread.join()
+
+class HeadlessLabel:
+    """代替 ttk.Label，只保存文本"""
+    def __init__(self):
+        self.text = ""
+
+    def config(self, **kwargs):
+        self.text = kwargs.get("text", self.text)
+
+def headless_app(config):
+    """构造不创建 Tk 窗口的 PomodoroApp，只保留计时器和界面更新管线"""
+    from pomodoro_core import PomodoroTimer
+    from pomodoro_gui import PomodoroApp
+
+    app = PomodoroApp.__new__(PomodoroApp)
+    app.config = config
+    app.timer = PomodoroTimer(config, app.update_display)
+    app._init_ui_pipeline()
+    app.root = None
+    app.main_thread = HeadlessMainThread(app._ui_requests)
+    app.status_label = HeadlessLabel()
+    app.time_label = HeadlessLabel()
+    app.cycle_label = HeadlessLabel()
+    app.start_button = HeadlessLabel()
+    return app
+
+def quiet_effects():
+    """只记录、不真正通知和锁屏的副作用执行器"""
+    from pomodoro_effects import EffectExecutor, RecordingBackend
+    return EffectExecutor(RecordingBackend())
+
+def current_rss_kb():
+    """当前进程常驻内存（KB）"""
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    try:
+        import resource
+        # 非 Linux 平台只能拿到峰值；macOS 单位为字节
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak // 1024 if sys.platform == "darwin" else peak
+    except ImportError:
+        return 0
+
+def percentile(values, fraction):
+    """简单百分位数"""
+    values = sorted(values)
+    if not values:
+        return 0.0
+    return values[int(fraction * (len(values) - 1))]
+
+def run_in_subprocess(name, *args, prefix=()):
+    """在干净的子进程中运行单项测试，避免内存测量互相干扰；prefix 为包在外面的命令"""
+    cmd = list(prefix) + [sys.executable, os.path.abspath(__file__), name, "--single"]
+    cmd += [str(a) for a in args]
+    output = subprocess.check_output(cmd)
+    return json.loads(output.decode("utf-8").strip().splitlines()[-1])
+
+def bench_drift(quick):
+    """会话结束时刻相对计划截止时间的偏差"""
+    from pomodoro_core import PomodoroTimer
+
+    sessions = 3 if quick else 6
+    # 每个会话 3 秒；工作两次后长休息
+    config = BenchConfig(work_time=0.05, short_break=0.05, long_break=0.05, cycles=2)
+    ends = []
+    done = threading.Event()
+    last = {"session": None}
+
+    def on_status(status):
+        if not status["is_running"]:
+            return  # stop() 之后的推送
+        if last["session"] is not None and status["session"] != last["session"]:
+            ends.append(timer.clock())
+            if len(ends) >= sessions:
+                done.set()
+        last["session"] = status["session"]
+
+    timer = PomodoroTimer(config, on_status)
+    timer.effects = quiet_effects()
+    timer.start()
+    expected = timer.deadline
+    done.wait(sessions * 3 + 10)
+    timer.stop()
+
+    drifts = []
+    for end in ends:
+        drifts.append((end - expected) * 1000)
+        expected += 3.0
+    result = {
+        "drift.sessions": len(drifts),
+        "drift.avg_ms": sum(drifts) / len(drifts) if drifts else 0.0,
+        "drift.max_ms": max(drifts) if drifts else 0.0
+    }
+    print(f"会话结束偏差: 平均 {result['drift.avg_ms']:.2f} ms, "
+          f"最大 {result['drift.max_ms']:.2f} ms ({len(drifts)} 个会话)")
+    return result
+
+def bench_wakeups(quick):
+    """计时循环每分钟被唤醒的次数"""
+    from pomodoro_core import PomodoroTimer
+
+    class CountingTimer(PomodoroTimer):
+        wakeups = 0
+
+        def _tick(self, now):
+            self.wakeups += 1
+            return PomodoroTimer._tick(self, now)
+
+    duration = 5.0 if quick else 20.0
+    timer = CountingTimer(BenchConfig())
+    timer.start()
+    time.sleep(duration)
+    timer.stop()
+    result = {"wakeups.per_minute": timer.wakeups * 60.0 / duration}
+    print(f"计时循环唤醒: {result['wakeups.per_minute']:.1f} 次/分钟")
+    return result
+
+def bench_ui_latency(quick):
+    """从计时回调到 _update_ui 执行的延迟"""
+    duration = 5.0 if quick else 20.0
+    app = headless_app(BenchConfig())
+    sent = []
+    latencies = []
+    update_display = app.update_display
+    update_ui = app._update_ui
+
+    def timed_update_display(status):
+        sent.append(time.perf_counter())
+        update_display(status)
+
+    def timed_update_ui(status):
+        latencies.append(time.perf_counter() - sent[-1])
+        update_ui(status)
+
+    app.timer.callback = timed_update_display
+    app._update_ui = timed_update_ui
+    app.timer.start()
+    time.sleep(duration)
+    app.timer.stop()
+    app.main_thread.stop()
+
+    latencies_ms = [x * 1000 for x in latencies]
+    result = {
+        "ui_latency.avg_ms": sum(latencies_ms) / len(latencies_ms) if latencies_ms else 0.0,
+        "ui_latency.p95_ms": percentile(latencies_ms, 0.95),
+        "ui_latency.max_ms": max(latencies_ms) if latencies_ms else 0.0,
+        "ui_redraws.performed": app.ui_stats["performed"],
+        "ui_redraws.skipped": app.ui_stats["skipped"]
+    }
+    print(f"tick → _update_ui: 平均 {result['ui_latency.avg_ms']:.3f} ms, "
+          f"p95 {result['ui_latency.p95_ms']:.3f} ms, 最大 {result['ui_latency.max_ms']:.3f} ms")
+    return result
+
+def bench_threads(quick):
+    """大量会话切换过程中的线程数"""
+    from pomodoro_core import PomodoroTimer
+
+    transitions = 50 if quick else 200
+    # 每个会话约 0.06 秒
+    config = BenchConfig(work_time=0.001, short_break=0.001, long_break=0.001, cycles=2)
+    baseline = threading.active_count()
+    peak = [baseline]
+    seen = [0]
+    done = threading.Event()
+    last = {"session": None}
+
+    def on_status(status):
+        peak[0] = max(peak[0], threading.active_count())
+        if last["session"] is not None and status["session"] != last["session"]:
+            seen[0] += 1
+            if seen[0] >= transitions:
+                done.set()
+        last["session"] = status["session"]
+
+    timer = PomodoroTimer(config, on_status)
+    timer.effects = quiet_effects()
+    timer.start()
+    done.wait(transitions * 0.06 + 30)
+    timer.stop()
+    result = {
+        "threads.transitions": seen[0],
+        "threads.baseline": baseline,
+        "threads.peak": peak[0]
+    }
+    print(f"{seen[0]} 次会话切换: 线程数 {baseline} → 峰值 {peak[0]}")
+    return result
+
+def actor_stress(senders, per_sender, scheduler=None):
+    """多个线程同时向一个计时器发送随机命令，返回统计结果
+
+    emitting_threads 为推送过状态的线程数，mutating_threads 为修改过计时状态的线程数，
+    两者都应为 1；peak_loop_threads 为计时循环线程数峰值（相对压力测试前），
+    应为 1（使用调度器时计时循环就是调度线程，峰值为 0）。
+    """
+    import random
+    from pomodoro_core import PomodoroTimer
+
+    # 会话极短，命令和会话切换交错发生
+    config = BenchConfig(work_time=0.002, short_break=0.001, long_break=0.001, cycles=2)
+    emitters = set()
+    mutators = set()
+    peak_threads = [0]
+    errors = []
+
+    def loop_threads():
+        return sum(1 for t in threading.enumerate() if t.name == "pomodoro-timer")
+
+    def on_status(status):
+        emitters.add(threading.get_ident())
+        peak_threads[0] = max(peak_threads[0], loop_threads())
+
+    class TrackedTimer(PomodoroTimer):
+        """记录修改计时状态的线程"""
+        __slots__ = ()
+
+        def __setattr__(self, name, value):
+            if name in ("is_running", "is_paused", "deadline", "current_session"):
+                mutators.add(threading.get_ident())
+            PomodoroTimer.__setattr__(self, name, value)
+
+    timer = TrackedTimer(config, on_status, scheduler=scheduler)
+    timer.effects = quiet_effects()
+    mutators.clear()  # 构造时的赋值不算
+    actions = [
+        lambda: timer.start(),
+        lambda: timer.pause(),
+        lambda: timer.stop(),
+        lambda: timer.skip(random.choice((1, -1))),
+        lambda: timer.seek(random.uniform(0, 3600)),
+        lambda: timer.post("toggle"),
+        lambda: timer.post("stop"),
+        lambda: timer.post("start"),
+        lambda: timer.post("set_refresh_granularity", random.choice((1, 60))),
+    ]
+    baseline = loop_threads()
+
+    def sender():
+        for _ in range(per_sender):
+            try:
+                random.choice(actions)()
+            except Exception as e:
+                errors.append(e)
+
+    threads = [threading.Thread(target=sender) for _ in range(senders)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    timer.stop()  # 等待命令队列处理到这里
+    elapsed = time.perf_counter() - start
+
+    # 压力测试后检查计时速度：正常计时 2 秒内应推送约 2 次
+    config.config = dict(config.config, work_time=25)
+    timer.reconfigure()
+    timer.set_refresh_granularity(1)
+    emitted = []
+    timer.callback = emitted.append
+    timer.start()
+    time.sleep(2.0)
+    timer.close()
+    running = [status["remaining_time"] for status in emitted if status["is_running"]]
+
+    return {
+        "commands": senders * per_sender,
+        "commands_per_sec": senders * per_sender / elapsed,
+        "errors": len(errors),
+        "emitting_threads": len(emitters),
+        "mutating_threads": len(mutators),
+        "peak_loop_threads": peak_threads[0] - baseline,
+        "seconds_counted_in_2s": 25 * 60 - min(running) if running else 0
+    }
+
+def bench_actor(quick):
+    """压力测试：多个线程同时发送大量随机命令，检查计时循环始终只有一个"""
+    senders = 8
+    r = actor_stress(senders, 500 if quick else 5000)
+    result = {f"actor.{key}": value for key, value in r.items()}
+    print(f"{senders} 个线程发送 {r['commands']} 条命令: "
+          f"{r['commands_per_sec']:.0f} 条/秒, 错误 {r['errors']}")
+    print(f"推送状态的线程 {r['emitting_threads']} 个, 修改状态的线程 {r['mutating_threads']} 个, "
+          f"计时循环线程峰值 {r['peak_loop_threads']}, "
+          f"之后 2 秒内计时走了 {r['seconds_counted_in_2s']} 秒（正常为 1~2）")
+    return result
+
+def bench_refresh(quick):
+    """窗口可见（逐秒）与隐藏（低功耗）时每小时的唤醒次数
+
+    统计界面进程中默认运行的全部周期线程：计时循环和配置热加载线程
+    （--metrics-file/--metrics-port 的线程需手动开启，不计入）
+    """
+    from pomodoro_core import MAX_WAIT, ConfigWatcher, PomodoroTimer
+
+    def timer_wakeups_per_hour(granularity):
+        # 手动推进的时钟：每次直接跳到计时器要求的唤醒时刻（单次等待不超过 MAX_WAIT），
+        # 一小时的计时瞬间完成
+        now = [0.0]
+        timer = PomodoroTimer(BenchConfig(), clock=lambda: now[0])
+        timer.effects = quiet_effects()
+        timer.refresh_granularity = granularity
+        timer.is_running = True
+        timer.reset_session()
+        timer.deadline = now[0] + timer._remaining
+        wakeups = 0
+        while now[0] < 3600:
+            now[0] = min(timer._tick(now[0]), now[0] + MAX_WAIT)
+            wakeups += 1
+        return wakeups
+
+    class ManualEvent:
+        """代替监视线程的等待：wait() 直接把手动时钟推进 timeout 秒"""
+        def __init__(self, now):
+            self.now = now
+
+        def wait(self, timeout):
+            self.now[0] += timeout
+            return False
+
+        def set(self):
+            pass
+
+        def clear(self):
+            pass
+
+    def watcher_wakeups_per_hour(interval=None):
+        # 在当前线程直接运行监视循环，一小时后由配置对象停止；interval 为 None 时用默认间隔
+        now = [0.0]
+
+        class CountingConfig(BenchConfig):
+            checks = 0
+
+            def reload_if_changed(self):
+                self.checks += 1
+                if now[0] >= 3600:
+                    watcher.stop()
+                return False
+
+        config = CountingConfig()
+        watcher = ConfigWatcher(config)
+        if interval is not None:
+            watcher.set_interval(interval)
+        watcher._wake = ManualEvent(now)
+        watcher._run()
+        return config.checks
+
+    hidden_seconds = 60
+    result = {
+        "refresh.visible_wakeups_per_hour": timer_wakeups_per_hour(1),
+        "refresh.hidden_wakeups_per_hour": timer_wakeups_per_hour(hidden_seconds),
+        "refresh.visible_watcher_wakeups_per_hour": watcher_wakeups_per_hour(),
+        "refresh.hidden_watcher_wakeups_per_hour": watcher_wakeups_per_hour(hidden_seconds)
+    }
+    for mode in ("visible", "hidden"):
+        result[f"refresh.{mode}_total_wakeups_per_hour"] = (
+            result[f"refresh.{mode}_wakeups_per_hour"] + result[f"refresh.{mode}_watcher_wakeups_per_hour"])
+    print(f"每小时唤醒: 窗口可见 {result['refresh.visible_total_wakeups_per_hour']} 次"
+          f"（计时 {result['refresh.visible_wakeups_per_hour']}, "
+          f"配置检查 {result['refresh.visible_watcher_wakeups_per_hour']}）, "
+          f"隐藏 {result['refresh.hidden_total_wakeups_per_hour']} 次"
+          f"（计时 {result['refresh.hidden_wakeups_per_hour']}, "
+          f"配置检查 {result['refresh.hidden_watcher_wakeups_per_hour']}）")
+    return result
+
+def bench_allocations(quick):
+    """计时推进路径的内存分配（tracemalloc）"""
+    import tracemalloc
+    from pomodoro_core import PomodoroTimer
+
+    ticks = 20000 if quick else 100000
+    now = [0.0]
+    statuses = [0]
+
+    def on_status(status):
+        statuses[0] += 1
+
+    # 正常的 25 分钟会话；每次快要结束时把截止时间推后，只测量会话内的逐秒推进
+    timer = PomodoroTimer(BenchConfig(), on_status, clock=lambda: now[0])
+    timer.is_running = True
+    timer.reset_session()
+    timer.deadline = now[0] + timer._remaining
+    # 预热：让快照和时间文本表进入稳定状态
+    for _ in range(100):
+        now[0] = timer._tick(now[0])
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    if hasattr(tracemalloc, "reset_peak"):  # Python 3.9+
+        tracemalloc.reset_peak()
+    for _ in range(ticks):
+        if timer.deadline - now[0] < 2:
+            timer.deadline += 1400
+        now[0] = timer._tick(now[0])
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    repeated = timer.get_status() is timer.get_status()
+    result = {
+        "allocations.retained_bytes_per_tick": (current - before) / ticks,
+        "allocations.peak_transient_bytes": peak - before,
+        "allocations.status_reused": 1 if repeated else 0
+    }
+    print(f"{ticks} 次推进: 每次保留 {result['allocations.retained_bytes_per_tick']:.3f} B, "
+          f"瞬时峰值 {result['allocations.peak_transient_bytes']} B, 快照复用: {repeated}")
+    return result
+
+def bench_tray(quick):
+    """托盘进度图标每次推进的更新成本：缓存帧 vs 每次重新绘制"""
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        print("未安装 Pillow，跳过")
+        return {}
+    from pomodoro_tray import TrayFrames, render_frame
+
+    ticks = 300 if quick else 1500
+    duration = 1500
+    frames = TrayFrames()
+    frames.prerender()
+
+    start = time.perf_counter()
+    for remaining in range(duration, duration - ticks, -1):
+        render_frame(0, frames.index_for(remaining, duration))
+    naive = (time.perf_counter() - start) / ticks
+
+    shown = None
+    swaps = 0
+    start = time.perf_counter()
+    for remaining in range(duration, duration - ticks, -1):
+        index = frames.index_for(remaining, duration)
+        key = frames.key(0, index)
+        if key != shown:
+            frames.get(0, index)
+            shown = key
+            swaps += 1
+    cached = (time.perf_counter() - start) / ticks
+
+    result = {
+        "tray.naive_us_per_tick": naive * 1e6,
+        "tray.cached_us_per_tick": cached * 1e6,
+        "tray.icon_swaps": swaps
+    }
+    print(f"每次推进: 重新绘制 {result['tray.naive_us_per_tick']:.1f} µs, "
+          f"缓存帧 {result['tray.cached_us_per_tick']:.2f} µs（{ticks} 秒内切换 {swaps} 次）")
+    return result
+
+def bench_memory(quick):
+    """每个计时器实例的内存占用"""
+    import tracemalloc
+    from pomodoro_core import PomodoroTimer
+    from pomodoro_scheduler import TimerScheduler
+
+    count = 1000 if quick else 10000
+    config = BenchConfig()
+    scheduler = TimerScheduler()  # 不启动调度线程，只测量对象本身
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    timers = [PomodoroTimer(config, scheduler=scheduler) for _ in range(count)]
+    idle = tracemalloc.get_traced_memory()[0]
+    for timer in timers:
+        timer.start()
+    running = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    result = {
+        "memory.idle_bytes_per_timer": (idle - before) / count,
+        "memory.running_bytes_per_timer": (running - before) / count
+    }
+    print(f"每个计时器: 空闲 {result['memory.idle_bytes_per_timer']:.0f} B, "
+          f"运行中 {result['memory.running_bytes_per_timer']:.0f} B")
+    return result
+
+def bench_scheduler_single(count, duration):
+    """单个规模：count 个计时器由一个调度线程驱动 duration 秒"""
+    from pomodoro_core import PomodoroTimer
+    from pomodoro_scheduler import TimerScheduler
+
+    ticks = [0]
+    def on_tick(status):
+        ticks[0] += 1
+
+    rss_before = current_rss_kb()
+    scheduler = TimerScheduler()
+    scheduler.start()
+    config = BenchConfig()
+    timers = [PomodoroTimer(config, on_tick, scheduler=scheduler) for _ in range(count)]
+    for timer in timers:
+        timer.start()
+
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    time.sleep(duration)
+    cpu = time.process_time() - cpu_start
+    wall = time.perf_counter() - wall_start
+    rss_after = current_rss_kb()
+    threads = threading.active_count()
+    scheduler.stop()
+
+    return {
+        "timers": count,
+        "threads": threads,
+        "ticks_per_sec": ticks[0] / wall,
+        "cpu_percent": 100.0 * cpu / wall,
+        "rss_kb": rss_after,
+        "rss_per_timer_bytes": 1024.0 * (rss_after - rss_before) / count
+    }
+
+def bench_scheduler(quick):
+    """调度器扩展性：CPU 与内存随计时器数量的增长"""
+    counts = (10, 100, 1000) if quick else (10, 100, 1000, 10000)
+    duration = 3.0 if quick else 10.0
+    print(f"{'计时器':>8} {'线程':>6} {'tick/秒':>10} {'CPU%':>8} {'RSS(MB)':>9} {'每个(B)':>9}")
+    result = {}
+    for count in counts:
+        r = run_in_subprocess("scheduler", count, duration)
+        print(f"{r['timers']:>8} {r['threads']:>6} {r['ticks_per_sec']:>10.0f} "
+              f"{r['cpu_percent']:>8.1f} {r['rss_kb'] / 1024:>9.1f} {r['rss_per_timer_bytes']:>9.0f}")
+        for key in ("cpu_percent", "rss_kb", "rss_per_timer_bytes"):
+            result[f"scheduler.{count}.{key}"] = r[key]
+    return result
+
+def bench_footprint_single(mode, settle):
+    """单个模式：空闲的番茄钟应用（不含托盘）稳定 settle 秒后的常驻内存和线程数
+
+    eager 为启动即创建 Tk 窗口，lazy 为托盘模式不创建窗口，
+    released 为打开过一次窗口、隐藏后界面被释放
+    """
+    import tempfile
+    import tkinter as tk
+    from pomodoro_gui import PomodoroApp
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)  # 配置、历史和检查点文件写在临时目录
+        try:
+            app = PomodoroApp(lazy_ui=mode != "eager", release_after=0)
+            if mode == "released":
+                app._ensure_ui()
+                app.root.update()
+                app._release_ui()
+            time.sleep(float(settle))
+            result = {"mode": mode, "rss_kb": current_rss_kb(),
+                      "threads": threading.active_count()}
+            app.timer.close(timeout=2.0)
+            if app.root is not None:
+                app.root.destroy()
+        except tk.TclError as e:
+            result = {"mode": mode, "error": str(e)}
+        finally:
+            os.chdir(cwd)
+    return result
+
+def bench_footprint(quick):
+    """托盘模式的空闲内存与线程数（与启动即创建窗口、界面释放后对比）
+
+    eager 和 released 需要图形界面；Linux 上没有 DISPLAY 时尝试用 xvfb-run 提供虚拟显示，
+    仍无法创建窗口的模式记为 None
+    """
+    import shutil
+    settle = 1.0 if quick else 5.0
+    prefix = ()
+    if sys.platform.startswith("linux") and not os.environ.get("DISPLAY") and shutil.which("xvfb-run"):
+        prefix = ("xvfb-run", "-a")
+    result = {}
+    print(f"{'模式':<10}{'RSS(MB)':>10}{'线程':>6}")
+    for mode in ("eager", "lazy", "released"):
+        r = run_in_subprocess("footprint", mode, settle, prefix=prefix)
+        if "error" in r:
+            print(f"{mode:<10}{'需要图形界面':>10}  ({r['error']})")
+            r = {"rss_kb": None, "threads": None}
+        else:
+            print(f"{mode:<10}{r['rss_kb'] / 1024:>10.1f}{r['threads']:>6}")
+        result[f"footprint.{mode}.rss_kb"] = r["rss_kb"]
+        result[f"footprint.{mode}.threads"] = r["threads"]
+    eager = result["footprint.eager.rss_kb"]
+    for mode, label in (("lazy", "托盘模式"), ("released", "释放界面后")):
+        if eager is not None and result[f"footprint.{mode}.rss_kb"] is not None:
+            saved = eager - result[f"footprint.{mode}.rss_kb"]
+            print(f"{label}比启动即创建窗口节省 {saved / 1024:.1f} MB")
+    if eager is None:
+        print("没有图形界面，无法与 eager 对比（可安装 xvfb-run 后重新运行）")
+    return result
+
+def bench_history(quick):
+    """会话历史：批量写入速度与一年日汇总查询耗时"""
+    import random
+    import tempfile
+    from pomodoro_history import SessionHistory
+
+    records = 50000 if quick else 300000
+    with tempfile.TemporaryDirectory() as tmp:
+        history = SessionHistory(os.path.join(tmp, "history.db"))
+        now = time.time()
+        start = time.perf_counter()
+        for i in range(records):
+            ended = now - random.uniform(0, 2 * 365 * 86400)
+            history.record(i % 3, i % 4, ended - 1500, ended, 1500.0, 1500.0, 0.0, True)
+        history.flush()
+        write = time.perf_counter() - start
+
+        start = time.perf_counter()
+        days = history.focus_minutes_per_day(365)
+        query = time.perf_counter() - start
+        start = time.perf_counter()
+        weeks = history.weekly_summary(52)
+        weekly_query = time.perf_counter() - start
+        history.close()
+
+    result = {
+        "history.records_per_sec": records / write,
+        "history.daily_query_ms": query * 1000,
+        "history.weekly_query_ms": weekly_query * 1000
+    }
+    print(f"写入 {records} 条: {result['history.records_per_sec']:.0f} 条/秒")
+    print(f"一年每日专注分钟: {result['history.daily_query_ms']:.2f} ms ({len(days)} 行)")
+    print(f"一年每周汇总: {result['history.weekly_query_ms']:.2f} ms ({len(weeks)} 行)")
+    return result
+
+def bench_timeline(quick):
+    """时间线查询：二分查找定位 vs 逐个会话推演"""
+    import random
+    from pomodoro_core import PomodoroTimer
+    from pomodoro_timeline import DAY_SECONDS
+
+    queries = 2000 if quick else 20000
+    timer = PomodoroTimer(BenchConfig())
+    timeline = timer.timeline()
+    offsets = [random.uniform(0, DAY_SECONDS) for _ in range(queries)]
+
+    start = time.perf_counter()
+    for offset in offsets:
+        timeline.slot_at(offset)
+    lookup = (time.perf_counter() - start) / queries
+
+    start = time.perf_counter()
+    for offset in offsets:
+        timer.current_session = timer.current_cycle = 0
+        ends_at = timer.session_duration(0)
+        while ends_at <= offset:
+            timer._next_session()
+            ends_at += timer.session_duration(timer.current_session)
+    stepped = (time.perf_counter() - start) / queries
+
+    start = time.perf_counter()
+    for offset in offsets:
+        timer.forecast(time.time() + offset)
+    forecast = (time.perf_counter() - start) / queries
+
+    result = {
+        "timeline.lookup_us": lookup * 1e6,
+        "timeline.stepped_us": stepped * 1e6,
+        "timeline.forecast_us": forecast * 1e6
+    }
+    print(f"定位一天内任意时刻: 二分查找 {result['timeline.lookup_us']:.2f} µs, "
+          f"逐个推演 {result['timeline.stepped_us']:.1f} µs")
+    print(f"forecast(): {result['timeline.forecast_us']:.2f} µs")
+    return result
+
+def process_cpu_seconds(pid):
+    """进程累计 CPU 时间（秒），只支持 Linux，其他平台返回 None"""
+    try:
+        with open(f"/proc/{pid}/stat", encoding="ascii") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+    except OSError:
+        return None
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+def bench_sync(quick):
+    """团队同步服务：大量本地订阅连接下的广播延迟与服务端 CPU"""
+    import asyncio
+    import tempfile
+
+    subscribers = 1000 if quick else 10000
+    rounds = 6 if quick else 20
+    idle = 2.0 if quick else 5.0
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pomodoro_sync.py")
+    try:
+        import resource
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        wanted = subscribers + 256
+        if soft < wanted and (hard == resource.RLIM_INFINITY or hard >= wanted):
+            resource.setrlimit(resource.RLIMIT_NOFILE, (wanted, hard))
+    except (ImportError, ValueError, OSError):
+        pass
+
+    with tempfile.TemporaryDirectory() as workdir:
+        server = subprocess.Popen([sys.executable, script, "serve", "--port", "0"], cwd=workdir,
+                                  stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        try:
+            address = server.stdout.readline().decode("utf-8").rsplit(" ", 1)[1].strip()
+            host, port = address.rsplit(":", 1)
+            stats = asyncio.run(_sync_load(host, int(port), server.pid, subscribers, rounds, idle))
+        finally:
+            server.terminate()
+            server.wait()
+
+    latencies = [x * 1000 for x in stats["latencies"]]
+    lasts = [x * 1000 for x in stats["lasts"]]
+    result = {
+        "sync.subscribers": stats["connected"],
+        "sync.connect_s": stats["connect_s"],
+        "sync.fanout_p50_ms": percentile(latencies, 0.5),
+        "sync.fanout_p95_ms": percentile(latencies, 0.95),
+        "sync.fanout_last_ms": max(lasts) if lasts else 0.0,
+        "sync.cpu_ms_per_transition": stats["cpu_per_round"] * 1000
+            if stats["cpu_per_round"] is not None else None,
+        "sync.idle_cpu_percent": stats["idle_cpu"] * 100 if stats["idle_cpu"] is not None else None
+    }
+    print(f"{stats['connected']} 个订阅连接，建立耗时 {stats['connect_s']:.2f} s")
+    print(f"状态切换 → 订阅者收到: p50 {result['sync.fanout_p50_ms']:.1f} ms, "
+          f"p95 {result['sync.fanout_p95_ms']:.1f} ms, 最后一个 {result['sync.fanout_last_ms']:.1f} ms")
+    if stats["cpu_per_round"] is not None:
+        print(f"服务端 CPU: 每次广播 {result['sync.cpu_ms_per_transition']:.1f} ms, "
+              f"倒计时中空闲 {result['sync.idle_cpu_percent']:.2f}%（无逐秒推送）")
+    return result
+
+async def _sync_load(host, port, pid, count, rounds, idle):
+    """bench_sync 的客户端部分：建立订阅、发送状态切换并记录每个订阅者的收到时刻"""
+    import asyncio
+
+    arrivals = {}        # 版本号 -> 收到时刻列表
+    complete = {}        # 版本号 -> 全部收到时触发的事件
+    readers = []
+    snapshot = {}
+
+    async def subscribe():
+        reader, writer = await asyncio.open_connection(host, port)
+        writer.write(b'{"cmd": "subscribe"}\n')
+        snapshot["version"] = json.loads(await reader.readline())["version"]
+        readers.append(writer)
+        while True:
+            line = await reader.readline()
+            if not line:
+                return
+            version = json.loads(line)["version"]
+            times = arrivals.setdefault(version, [])
+            times.append(time.perf_counter())
+            if len(times) == len(readers) and version in complete:
+                complete[version].set()
+
+    start = time.perf_counter()
+    tasks = []
+    for first in range(0, count, 500):
+        batch = [asyncio.ensure_future(subscribe()) for _ in range(min(500, count - first))]
+        tasks += batch
+        while len(readers) < first + len(batch):
+            await asyncio.sleep(0.01)
+    connect_s = time.perf_counter() - start
+
+    control_reader, control = await asyncio.open_connection(host, port)
+    latencies = []
+    lasts = []
+    version = snapshot.get("version", 0)
+    cpu_start = process_cpu_seconds(pid)
+    for i in range(rounds):
+        version += 1
+        complete[version] = asyncio.Event()
+        sent = time.perf_counter()
+        control.write(b'{"cmd": "start"}\n' if i % 2 == 0 else b'{"cmd": "pause"}\n')
+        await control_reader.readline()
+        try:
+            await asyncio.wait_for(complete[version].wait(), 30)
+        except asyncio.TimeoutError:
+            pass
+        times = arrivals.get(version, [])
+        latencies += [t - sent for t in times]
+        if times:
+            lasts.append(max(times) - sent)
+    cpu_rounds = process_cpu_seconds(pid)
+
+    # 倒计时进行中保持订阅，服务端应几乎不占 CPU
+    if rounds % 2 == 0:
+        control.write(b'{"cmd": "start"}\n')
+        await control_reader.readline()
+        await asyncio.sleep(0.5)
+    cpu_idle_start = process_cpu_seconds(pid)
+    await asyncio.sleep(idle)
+    cpu_idle_end = process_cpu_seconds(pid)
+
+    control.close()
+    for writer in readers:
+        writer.close()
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    measured = cpu_start is not None
+    return {
+        "connected": len(readers),
+        "connect_s": connect_s,
+        "latencies": latencies,
+        "lasts": lasts,
+        "cpu_per_round": (cpu_rounds - cpu_start) / rounds if measured else None,
+        "idle_cpu": (cpu_idle_end - cpu_idle_start) / idle if measured else None
+    }
+
+def bench_audio(quick):
+    """提示音延迟：从会话结束到第一块样本写给输出端（NullSink 与 WAV 文件）"""
+    import tempfile
+    import wave
+    from pomodoro_audio import AudioCues, NullSink, WavSink
+    from pomodoro_core import PomodoroTimer
+
+    sessions = 4 if quick else 12
+    # 每个会话 0.6 秒，结束前 0.3 秒播放提醒音
+    config = BenchConfig(work_time=0.01, short_break=0.01, long_break=0.01, cycles=2,
+                         warning_seconds=0.3)
+    result = {}
+    print(f"{'输出端':<8}{'提示音':>6}{'平均(ms)':>10}{'p95(ms)':>10}{'最大(ms)':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "cues.wav")
+        for label, sink in (("null", NullSink()), ("wav", WavSink(path))):
+            effects = quiet_effects()
+            audio = AudioCues(sink)
+            done = threading.Event()
+            timer = PomodoroTimer(config, lambda status: None)
+            timer.effects = effects
+            timer.audio = audio
+            timer.callback = lambda status: audio.played >= 2 * sessions and done.set()
+            timer.start()
+            done.wait(sessions * 0.6 + 5.0)
+            timer.stop()
+            timer.close()
+            audio.close()
+            stats = audio.stats()
+            print(f"{label:<8}{stats['played']:>6}{stats['latency_avg_ms']:>10.3f}"
+                  f"{stats['latency_p95_ms']:>10.3f}{stats['latency_max_ms']:>10.3f}")
+            for key in ("played", "latency_avg_ms", "latency_p95_ms", "latency_max_ms"):
+                result[f"audio.{label}.{key}"] = stats[key]
+            notify = effects.stats().get("notify")
+            if notify and "latency_avg_ms" in notify:
+                result[f"audio.{label}.notify_avg_ms"] = notify["latency_avg_ms"]
+            effects.shutdown()
+        with wave.open(path, "rb") as f:
+            written = f.getnframes()
+    from pomodoro_audio import PCM_RATE
+    print(f"WAV 文件写入 {written} 帧（{written / PCM_RATE:.2f} 秒音频）")
+    print(f"对比: 同一会话结束的通知（记录后端）平均 {result.get('audio.null.notify_avg_ms', 0):.3f} ms")
+    return result
+
+def bench_simulation(quick):
+    """虚拟时钟快进模拟：数周会话的回放耗时与可复现性"""
+    from pomodoro_sim import Simulation, weekly_script
+
+    days = 7 if quick else 28
+
+    def replay():
+        sim = Simulation(BenchConfig(auto_lock=True))
+        weekly_script(sim, days)
+        start = time.perf_counter()
+        sim.run_for(days * 86400)
+        return time.perf_counter() - start, sim.trace
+
+    elapsed, trace = replay()
+    _, again = replay()
+    result = {
+        "simulation.days": days,
+        "simulation.ms": elapsed * 1000,
+        "simulation.events": len(trace),
+        "simulation.reproducible": trace == again
+    }
+    print(f"模拟 {days} 天: {result['simulation.ms']:.1f} ms, {len(trace)} 条轨迹, "
+          f"两次回放完全一致: {result['simulation.reproducible']}")
+    return result
+
+# 名称 -> 测试函数（按运行顺序）
+BENCHMARKS = {
+    "drift": bench_drift,
+    "wakeups": bench_wakeups,
+    "ui_latency": bench_ui_latency,
+    "threads": bench_threads,
+    "actor": bench_actor,
+    "refresh": bench_refresh,
+    "allocations": bench_allocations,
+    "tray": bench_tray,
+    "memory": bench_memory,
+    "footprint": bench_footprint,
+    "scheduler": bench_scheduler,
+    "history": bench_history,
+    "timeline": bench_timeline,
+    "audio": bench_audio,
+    "simulation": bench_simulation,
+    "sync": bench_sync
+}
+
+# 需要在干净子进程中运行的单项测试（run_in_subprocess）
+SINGLE_RUNS = {
+    "scheduler": lambda count, duration: bench_scheduler_single(int(count), float(duration)),
+    "footprint": bench_footprint_single
+}
+
+def git_commit():
+    """当前提交，用于标记结果"""
+    try:
+        output = subprocess.check_output(["git", "rev-parse", "--short", "HEAD"],
+                                         stderr=subprocess.DEVNULL)
+        return output.decode("ascii").strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def format_cell(value):
+    """数值保留三位小数；None（该平台无法测量）显示为 -，其他值原样显示"""
+    if value is None:
+        return "-"
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return f"{value:.3f}"
+    return str(value)
+
+def compare(old, new):
+    """打印两次结果的对比，只对两边都是数值的指标计算变化"""
+    print(f"\n{'指标':<40}{'之前':>14}{'现在':>14}{'变化':>10}")
+    for key, value in new["results"].items():
+        before = old["results"].get(key)
+        change = ""
+        numeric = all(isinstance(v, (int, float)) and not isinstance(v, bool)
+                      for v in (before, value))
+        if numeric and before:
+            change = f"{(value - before) / before * 100:+.1f}%"
+        print(f"{key:<40}{format_cell(before):>14}{format_cell(value):>14}{change:>10}")
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="番茄钟性能测试")
+    parser.add_argument("names", nargs="*", metavar="name",
+                        help="测试项目: " + ", ".join(BENCHMARKS) + "（默认全部）")
+    parser.add_argument("--quick", action="store_true", help="缩短测量时间")
+    parser.add_argument("--json", metavar="FILE", help="把结果保存为 JSON")
+    parser.add_argument("--compare", metavar="FILE", help="与之前保存的 JSON 结果对比")
+    parser.add_argument("--single", nargs="*", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single is not None:
+        print(json.dumps(SINGLE_RUNS[args.names[0]](*args.single)))
+        return
+
+    names = args.names or list(BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        parser.error("未知的测试项目: " + ", ".join(unknown))
+
+    print("🍅 番茄钟性能测试")
+    print("=" * 40)
+    results = {}
+    for name in names:
+        print(f"\n[{name}] {BENCHMARKS[name].__doc__}")
+        results.update(BENCHMARKS[name](args.quick))
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.time(),
+            "quick": args.quick
+        },
+        "results": results
+    }
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"\n📁 结果已保存: {args.json}")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(json.load(f), report)
+
+if __name__ == "__main__":
+    main()
@@ -24,47 +24,142 @@ def install_pyinstaller():
         print("2. 或者使用conda: conda install pyinstaller")
         return False
 
-def build_exe():
-    """构建exe文件"""
-    print("开始打包番茄钟程序...")
-    
-    # PyInstaller命令参数
+APP_NAME = "番茄钟"
+
+# 打包方案：onefile 每次启动都要把整个包解压到临时目录；
+# onedir 直接从安装目录加载，启动最快；lean 在 onedir 基础上裁掉用不到的模块
+PROFILES = {
+    "onefile": {"mode": "--onefile", "exclude": False},
+    "onedir": {"mode": "--onedir", "exclude": False},
+    "lean": {"mode": "--onedir", "exclude": True},
+}
+DEFAULT_PROFILE = "onedir"
+
+# 程序用不到的模块（PIL 只需要 PNG/ICO/BMP，Tk 只用基本控件）
+EXCLUDED_MODULES = [
+    # PIL 插件和可选集成
+    "PIL.ImageQt", "PIL.ImageShow", "PIL.ImageGrab", "PIL.ImageCms",
+    "PIL.PdfImagePlugin", "PIL.TiffImagePlugin", "PIL.WebPImagePlugin",
+    "PIL.JpegImagePlugin", "PIL.Jpeg2KImagePlugin", "PIL.PsdImagePlugin",
+    "PIL.SpiderImagePlugin", "PIL.EpsImagePlugin", "PIL.FitsImagePlugin",
+    "PIL.MpoImagePlugin", "PIL.BlpImagePlugin", "PIL.DdsImagePlugin",
+    "PIL.ImImagePlugin", "PIL.XVThumbImagePlugin",
+    "numpy", "olefile", "defusedxml",
+    # Tk 中用不到的部分
+    "tkinter.tix", "tkinter.dnd", "tkinter.test", "turtle", "turtledemo", "idlelib",
+    # 其他标准库
+    "unittest", "pydoc", "doctest", "lib2to3", "xmlrpc", "pdb",
+]
+
+def artifact_path(profile):
+    """打包产物（可执行文件）的路径"""
+    exe = APP_NAME + (".exe" if sys.platform == "win32" else "")
+    dist = os.path.join("dist", profile)
+    if PROFILES[profile]["mode"] == "--onedir":
+        return os.path.join(dist, APP_NAME, exe)
+    return os.path.join(dist, exe)
+
+def bundle_size(profile):
+    """产物总大小（字节），onedir 统计整个目录"""
+    path = artifact_path(profile)
+    if PROFILES[profile]["mode"] == "--onefile":
+        return os.path.getsize(path)
+    total = 0
+    for root, _, files in os.walk(os.path.dirname(path)):
+        for name in files:
+            total += os.path.getsize(os.path.join(root, name))
+    return total
+
+def add_data(source):
+    """--add-data 参数（源路径和目标目录的分隔符因平台而异）"""
+    return f"--add-data={source}{os.pathsep}."
+
+def notification_backend():
+    """当前平台的 plyer 通知后端模块"""
+    if sys.platform == "win32":
+        return "plyer.platforms.win.notification"
+    if sys.platform == "darwin":
+        return "plyer.platforms.macosx.notification"
+    return "plyer.platforms.linux.notification"
+
+def build_command(profile):
+    """生成 PyInstaller 命令"""
+    options = PROFILES[profile]
     cmd = [
         "pyinstaller",
-        "--onefile",                    # 打包成单个exe文件
+        options["mode"],
         "--windowed",                   # 不显示控制台窗口
-        "--name=番茄钟",                # 设置exe文件名
-        "--icon=tomato.ico",           # 图标文件（如果存在）
-        "--add-data=pomodoro_config.json;.",  # 包含配置文件
+        "--noconfirm",
+        f"--name={APP_NAME}",
+        f"--distpath={os.path.join('dist', profile)}",
+        f"--workpath={os.path.join('build', profile)}",
+        add_data("tomato_icon.png"),    # 预制托盘图标
         "--hidden-import=PIL._tkinter_finder",  # 隐式导入
-        "--hidden-import=plyer.platforms.win.notification",
-        "pomodoro_gui.py"
+        f"--hidden-import={notification_backend()}",
     ]
-    
+    if os.path.exists("tomato.ico"):
+        cmd.append("--icon=tomato.ico")
+    if os.path.exists("pomodoro_config.json"):
+        cmd.append(add_data("pomodoro_config.json"))
+    if options["exclude"]:
+        cmd += [f"--exclude-module={name}" for name in EXCLUDED_MODULES]
+    cmd.append("pomodoro_gui.py")
+    return cmd
+
+def build_exe(profile=DEFAULT_PROFILE):
+    """按指定方案打包"""
+    print(f"开始打包番茄钟程序（{profile}）...")
     try:
-        # 如果没有图标文件，移除图标参数
-        if not os.path.exists("tomato.ico"):
-            cmd.remove("--icon=tomato.ico")
-        
-        # 如果没有配置文件，移除配置文件参数
-        if not os.path.exists("pomodoro_config.json"):
-            cmd.remove("--add-data=pomodoro_config.json;.")
-        
-        subprocess.check_call(cmd)
-        print("✅ 打包成功！")
-        
-        # 检查生成的文件
-        exe_path = os.path.join("dist", "番茄钟.exe")
-        if os.path.exists(exe_path):
-            file_size = os.path.getsize(exe_path) / (1024 * 1024)  # MB
-            print(f"📁 生成的exe文件: {exe_path}")
-            print(f"📊 文件大小: {file_size:.1f} MB")
-        
-        return True
-        
+        subprocess.check_call(build_command(profile))
     except subprocess.CalledProcessError as e:
         print(f"❌ 打包失败: {e}")
         return False
+    print("✅ 打包成功！")
+    print(f"📁 生成的程序: {artifact_path(profile)}")
+    print(f"📊 大小: {bundle_size(profile) / (1024 * 1024):.1f} MB")
+    return True
+
+def measure_startup(profile, runs=3):
+    """无界面启动打包产物（--smoke-test）并测量耗时
+
+    在临时目录中运行，避免写入开发目录的配置；
+    第一次为冷启动，其余取中位数作为热启动。失败时返回 None
+    """
+    import statistics
+    import tempfile
+    import time
+
+    exe = os.path.abspath(artifact_path(profile))
+    times = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for _ in range(runs):
+            start = time.perf_counter()
+            try:
+                result = subprocess.run([exe, "--smoke-test"], cwd=workdir, timeout=120,
+                                        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            except (OSError, subprocess.TimeoutExpired) as e:
+                print(f"❌ 启动检查失败: {e}")
+                return None
+            if result.returncode != 0:
+                print(f"❌ 启动检查失败，退出码 {result.returncode}")
+                return None
+            times.append(time.perf_counter() - start)
+    return {
+        "cold_ms": times[0] * 1000,
+        "warm_ms": statistics.median(times[1:] or times) * 1000,
+        "size_mb": bundle_size(profile) / (1024 * 1024),
+    }
+
+def report(results):
+    """打印各打包方案的对比"""
+    print(f"\n{'方案':<10}{'冷启动':>12}{'热启动':>12}{'大小':>12}")
+    print("-" * 46)
+    for profile, stats in results.items():
+        if stats is None:
+            print(f"{profile:<10}{'失败':>12}")
+            continue
+        print(f"{profile:<10}{stats['cold_ms']:>10.0f}ms{stats['warm_ms']:>10.0f}ms"
+              f"{stats['size_mb']:>10.1f}MB")
 
 def create_icon():
     """创建简单的图标文件"""
@@ -91,7 +186,7 @@ def create_icon():
 def clean_build():
     """清理构建文件"""
     dirs_to_remove = ['build', '__pycache__']
-    files_to_remove = ['番茄钟.spec']
+    files_to_remove = [f'{APP_NAME}.spec']
     
     for dir_name in dirs_to_remove:
         if os.path.exists(dir_name):
@@ -105,6 +200,16 @@ def clean_build():
 
 def main():
     """主函数"""
+    import argparse
+    parser = argparse.ArgumentParser(description="番茄钟程序打包工具")
+    parser.add_argument("--profile", choices=list(PROFILES), action="append",
+                        help=f"打包方案，可重复指定（默认 {DEFAULT_PROFILE}）")
+    parser.add_argument("--all", action="store_true", help="依次构建全部方案并对比")
+    parser.add_argument("--no-measure", action="store_true", help="构建后不测量启动耗时")
+    parser.add_argument("--yes", action="store_true", help="不询问，直接退出（用于脚本）")
+    args = parser.parse_args()
+    profiles = list(PROFILES) if args.all else (args.profile or [DEFAULT_PROFILE])
+    
     print("🍅 番茄钟程序打包工具")
     print("=" * 40)
     
@@ -117,25 +222,36 @@ def main():
     create_icon()
     
     # 安装PyInstaller
-    if not install_pyinstaller():
+    if shutil.which("pyinstaller") is None and not install_pyinstaller():
         return
     
-    # 构建exe
-    if build_exe():
+    # 构建并测量
+    built = [profile for profile in profiles if build_exe(profile)]
+    if built and not args.no_measure:
+        results = {}
+        for profile in built:
+            print(f"⏱️ 正在测量启动耗时（{profile}）...")
+            results[profile] = measure_startup(profile)
+        report(results)
+    
+    if built:
         print("\n🎉 打包完成！")
-        print("📁 exe文件位置: dist/番茄钟.exe")
+        for profile in built:
+            print(f"📁 {profile}: {artifact_path(profile)}")
         print("\n💡 使用提示:")
-        print("1. 可以直接运行dist/番茄钟.exe")
-        print("2. 首次运行可能需要几秒钟启动时间")
-        print("3. 可以将exe文件复制到任何位置使用")
+        print("1. onedir/lean 方案启动最快，分发时请复制整个程序目录")
+        print("2. onefile 方案只有一个文件，但每次启动都要先解压")
         
-        # 询问是否清理构建文件
-        response = input("\n是否清理构建文件? (y/n): ")
-        if response.lower() in ['y', 'yes', '是']:
-            clean_build()
+    if args.yes:
+        return
+    
+    # 询问是否清理构建文件
+    response = input("\n是否清理构建文件? (y/n): ")
+    if response.lower() in ['y', 'yes', '是']:
+        clean_build()
     
     print("\n按任意键退出...")
     input()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+asyncio 版番茄钟
+在事件循环中驱动计时，不占用线程，通过 await next_event() 或 async for 获取事件
+
+用法:
+    timer = AsyncPomodoroTimer(PomodoroConfig())
+    timer.start()
+    async for event in timer:
+        if event.kind == SESSION_COMPLETE:
+            ...
+"""
+
+import asyncio
+from collections import namedtuple
+
+from pomodoro_core import MAX_WAIT, PomodoroTimer, monotonic_clock
+
+TICK = "tick"
+SESSION_COMPLETE = "session_complete"
+
+# kind: 事件类型；status: get_status() 结果；finished_session: 刚结束的会话（仅会话完成事件）
+TimerEvent = namedtuple("TimerEvent", ["kind", "status", "finished_session"])
+
+class AsyncPomodoroTimer(PomodoroTimer):
+    """asyncio 版番茄钟
+
+    会话切换逻辑沿用 PomodoroTimer._session_complete（工作 → 短休息 → 长休息），
+    只是把线程 + 回调换成事件循环中的任务 + 事件队列。
+    事件循环线程即拥有者：在其他线程调用 start/pause/stop 时，
+    命令通过 call_soon_threadsafe 转交给事件循环执行。
+    """
+    def __init__(self, config, clock=monotonic_clock, max_events=64):
+        super().__init__(config, self._push_event, clock)
+        self.max_events = max_events
+        self._loop = None
+        self._events = None
+        self._async_wakeup = None
+        self._task = None
+        self._completing = None  # 正在结束的会话编号
+
+    def _ensure_loop(self):
+        """绑定到当前事件循环（队列和事件必须在循环内创建）"""
+        if self._loop is None:
+            self._loop = asyncio.get_event_loop()
+            self._events = asyncio.Queue(self.max_events)
+            self._async_wakeup = asyncio.Event()
+
+    def _is_owner(self):
+        """是否在事件循环线程中（尚未绑定事件循环时直接执行）"""
+        if self._loop is None:
+            return True
+        try:
+            return asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            return False
+
+    def _submit(self, command):
+        """把命令转交给事件循环"""
+        self._loop.call_soon_threadsafe(command.run)
+
+    def _launch(self):
+        """在事件循环中创建计时任务"""
+        self._ensure_loop()
+        self._task = self._loop.create_task(self._run_async(self._generation))
+
+    def _notify(self):
+        """唤醒计时任务"""
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._async_wakeup.set)
+
+    async def _run_async(self, generation):
+        """计时器主协程"""
+        while self.is_running and generation == self._generation:
+            self._async_wakeup.clear()
+            wake_at = self._step()
+            timeout = None if wake_at is None else min(max(0.0, wake_at - self.clock()), MAX_WAIT)
+            try:
+                await asyncio.wait_for(self._async_wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def _session_complete(self, now=None):
+        """会话完成处理，额外发出会话完成事件"""
+        self._completing = self.current_session
+        try:
+            super()._session_complete(now)
+        finally:
+            self._completing = None
+
+    def _push_event(self, status):
+        """计时回调：放入事件队列，队列满时丢弃最旧的事件"""
+        if self._completing is None:
+            event = TimerEvent(TICK, status, None)
+        else:
+            event = TimerEvent(SESSION_COMPLETE, status, self._completing)
+        if self._events.full():
+            self._events.get_nowait()
+        self._events.put_nowait(event)
+
+    async def next_event(self):
+        """等待下一个计时事件"""
+        self._ensure_loop()
+        return await self._events.get()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        return await self.next_event()
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+番茄钟提示音
+工作结束、休息结束和结束前倒计时提醒三种提示音在启动时一次性解码（或合成）为
+内存中的 PCM 数据，由专门的播放线程写给输出端；提示音触发时不读文件、不解码，
+计时线程只把请求放入队列
+
+输出端只需提供 write(data) 和 close() 两个方法:
+- PipeSink: 写入常驻的 pacat/aplay 进程（Linux）
+- WinSoundSink: winsound 内存播放（Windows）
+- WavSink: 写入 WAV 文件，用于核对播放内容
+- NullSink: 丢弃样本，用于无声卡环境和测试
+
+配置文件中可用 "sound_files" 指定自己的 16 位 PCM WAV 文件，例如:
+
+    "sound_files": {"work_end": "bell.wav", "break_end": "chime.wav", "warning": "tick.wav"}
+"""
+
+import io
+import math
+import queue
+import shutil
+import subprocess
+import sys
+import threading
+import time
+import wave
+from array import array
+from collections import deque, namedtuple
+
+from pomodoro_metrics import REGISTRY
+
+PCM_RATE = 22050     # 采样率（Hz），所有提示音统一为单声道 16 位
+SAMPLE_WIDTH = 2
+CHUNK_FRAMES = 512   # 每次写给输出端的帧数
+
+# 未指定文件时合成的提示音：(频率 Hz, 时长 秒) 序列
+TONES = {
+    "work_end": ((660, 0.15), (880, 0.25)),   # 上行两音
+    "break_end": ((880, 0.15), (660, 0.25)),  # 下行两音
+    "warning": ((1000, 0.08),)                # 短促单音
+}
+CUE_NAMES = tuple(TONES)
+
+CUE_LATENCY = REGISTRY.histogram(
+    "pomodoro_audio_cue_latency_seconds", "提示音从触发到第一块样本交给输出端的耗时")
+CUES_PLAYED = REGISTRY.counter("pomodoro_audio_cues_total", "已播放的提示音次数")
+
+# pcm 为 PCM_RATE 单声道 16 位小端样本
+Cue = namedtuple("Cue", ["name", "pcm", "frames"])
+
+def _little_endian(samples):
+    if sys.byteorder == "big":
+        samples.byteswap()
+    return samples
+
+def synthesize(tones, rate=PCM_RATE, volume=0.4):
+    """合成正弦提示音，首尾 5 毫秒淡入淡出避免爆音"""
+    samples = array("h")
+    fade = max(1, int(rate * 0.005))
+    for frequency, seconds in tones:
+        count = int(rate * seconds)
+        step = 2 * math.pi * frequency / rate
+        for i in range(count):
+            envelope = min(1.0, i / fade, (count - 1 - i) / fade)
+            samples.append(int(32767 * volume * envelope * math.sin(step * i)))
+    return _little_endian(samples).tobytes()
+
+def decode_wav(path, rate=PCM_RATE):
+    """读取 16 位 PCM WAV 文件，转换为单声道（取第一个声道）并重采样到 rate"""
+    with wave.open(path, "rb") as f:
+        width = f.getsampwidth()
+        channels = f.getnchannels()
+        source_rate = f.getframerate()
+        data = f.readframes(f.getnframes())
+    if width != SAMPLE_WIDTH:
+        raise ValueError(f"只支持 16 位 PCM，文件为 {width * 8} 位")
+    samples = array("h")
+    samples.frombytes(data)
+    _little_endian(samples)  # 文件中是小端，转为本机字节序再处理
+    if channels > 1:
+        samples = samples[::channels]
+    if source_rate != rate:
+        ratio = source_rate / rate
+        samples = array("h", (samples[int(i * ratio)] for i in range(int(len(samples) / ratio))))
+    return _little_endian(samples).tobytes()
+
+def load_cues(files=None, rate=PCM_RATE):
+    """准备全部提示音；文件缺失或无法解码时使用合成音"""
+    files = files if isinstance(files, dict) else {}
+    cues = {}
+    for name in CUE_NAMES:
+        pcm = None
+        path = files.get(name)
+        if path:
+            try:
+                pcm = decode_wav(path, rate)
+            except (OSError, EOFError, ValueError, wave.Error) as e:
+                print(f"提示音 {name} 加载失败: {e}，使用默认提示音")
+        if pcm is None:
+            pcm = synthesize(TONES[name], rate)
+        cues[name] = Cue(name, pcm, len(pcm) // SAMPLE_WIDTH)
+    return cues
+
+def wav_bytes(pcm, rate=PCM_RATE):
+    """把 PCM 数据包装为内存中的 WAV 文件"""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(SAMPLE_WIDTH)
+        f.setframerate(rate)
+        f.writeframes(pcm)
+    return buffer.getvalue()
+
+class NullSink:
+    """丢弃样本，只统计写出的帧数"""
+    def __init__(self):
+        self.frames = 0
+
+    def write(self, data):
+        self.frames += len(data) // SAMPLE_WIDTH
+
+    def close(self):
+        pass
+
+class WavSink:
+    """把播放的样本依次追加到一个 WAV 文件"""
+    def __init__(self, path, rate=PCM_RATE):
+        self._file = wave.open(path, "wb")
+        self._file.setnchannels(1)
+        self._file.setsampwidth(SAMPLE_WIDTH)
+        self._file.setframerate(rate)
+
+    def write(self, data):
+        self._file.writeframes(data)
+
+    def close(self):
+        self._file.close()
+
+class PipeSink:
+    """写入常驻播放进程的标准输入，进程在启动时创建，触发时不再启动新进程"""
+    def __init__(self, command):
+        self.process = subprocess.Popen(command, stdin=subprocess.PIPE, bufsize=0,
+                                        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    def write(self, data):
+        self.process.stdin.write(data)
+
+    def close(self):
+        try:
+            self.process.stdin.close()
+            self.process.wait(timeout=2.0)
+        except (OSError, subprocess.TimeoutExpired):
+            self.process.kill()
+
+class WinSoundSink:
+    """Windows: winsound 从内存播放（同步），整段提示音一次写出"""
+    chunk_frames = None
+
+    def __init__(self, rate=PCM_RATE):
+        import winsound
+        self._winsound = winsound
+        self.rate = rate
+
+    def write(self, data):
+        self._winsound.PlaySound(wav_bytes(data, self.rate), self._winsound.SND_MEMORY)
+
+    def close(self):
+        pass
+
+def player_commands(rate=PCM_RATE):
+    """能从标准输入播放原始 PCM 的命令，按优先级排列"""
+    return [
+        ["pacat", "--raw", "--format=s16le", f"--rate={rate}", "--channels=1"],
+        ["aplay", "-q", "-t", "raw", "-f", "S16_LE", "-r", str(rate), "-c", "1"]
+    ]
+
+def default_sink(rate=PCM_RATE):
+    """当前平台可用的输出端，没有时返回 NullSink"""
+    if sys.platform == "win32":
+        return WinSoundSink(rate)
+    for command in player_commands(rate):
+        if shutil.which(command[0]):
+            try:
+                return PipeSink(command)
+            except OSError as e:
+                print(f"{command[0]} 启动失败: {e}")
+    print("没有可用的音频输出，提示音不会发声")
+    return NullSink()
+
+class AudioCues:
+    """预加载的提示音和播放线程
+
+    play() 只把请求放入有界队列后立即返回；队列已满时丢弃请求。
+    latencies 记录从 play() 到第一块样本交给输出端的耗时（秒）。
+    """
+    def __init__(self, sink=None, files=None, rate=PCM_RATE, max_queue=4):
+        self.cues = load_cues(files, rate)
+        self.sink = sink if sink is not None else default_sink(rate)
+        self.latencies = deque(maxlen=256)
+        self.played = 0
+        self.dropped = 0
+        self._queue = queue.Queue(max_queue)
+        self._thread = threading.Thread(target=self._run, name="pomodoro-audio")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def play(self, name):
+        """请求播放提示音，返回是否已放入队列"""
+        cue = self.cues.get(name)
+        if cue is None:
+            return False
+        try:
+            self._queue.put_nowait((cue, time.perf_counter()))
+        except queue.Full:
+            self.dropped += 1
+            return False
+        return True
+
+    def _run(self):
+        """播放线程主循环"""
+        chunk_frames = getattr(self.sink, "chunk_frames", CHUNK_FRAMES)
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            cue, requested_at = item
+            data = memoryview(cue.pcm)
+            step = chunk_frames * SAMPLE_WIDTH if chunk_frames else len(data)
+            try:
+                for offset in range(0, len(data), step):
+                    if offset == 0:
+                        self.latencies.append(time.perf_counter() - requested_at)
+                        CUE_LATENCY.observe(self.latencies[-1])
+                    self.sink.write(data[offset:offset + step])
+            except (OSError, RuntimeError, ValueError) as e:
+                print(f"播放提示音失败: {e}")
+                continue
+            self.played += 1
+            CUES_PLAYED.inc()
+
+    def stats(self):
+        """播放次数和延迟统计（毫秒）"""
+        latencies = sorted(self.latencies)
+        result = {"played": self.played, "dropped": self.dropped, "queued": self._queue.qsize()}
+        if latencies:
+            result["latency_avg_ms"] = 1000 * sum(latencies) / len(latencies)
+            result["latency_p95_ms"] = 1000 * latencies[int(0.95 * (len(latencies) - 1))]
+            result["latency_max_ms"] = 1000 * latencies[-1]
+        return result
+
+    def close(self, timeout=2.0):
+        """播放完队列中的提示音后停止播放线程并关闭输出端"""
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            return  # 输出端卡住，播放线程是守护线程，随进程退出
+        self._thread.join(timeout)
+        if not self._thread.is_alive():
+            self.sink.close()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+番茄钟状态检查点
+把当前会话、循环和截止时间保存在一个固定大小的内存映射文件中，
+只在状态切换（开始、暂停、恢复、停止、会话结束）时写入，不随每秒计时写盘。
+进程被杀或重启后可以据此恢复到原来的进度
+"""
+
+import mmap
+import os
+import struct
+import zlib
+from collections import namedtuple
+
+MAGIC = b"PMDR"
+VERSION = 2  # 2: 增加会话在时间线一轮中的位置
+
+# 魔数, 版本, 标志位, 序号, 会话, 循环, 位置, 截止时间(墙上时间), 剩余秒数, 会话开始时间, 已暂停秒数
+RECORD = struct.Struct("<4sHHQIII4d")
+SLOT = struct.Struct("<%dsI" % RECORD.size)  # 记录 + CRC32
+FILE_SIZE = 2 * SLOT.size                       # 双槽交替写入，写一半时另一槽仍然完整
+
+FLAG_RUNNING = 1
+FLAG_PAUSED = 2
+
+CheckpointState = namedtuple("CheckpointState", [
+    "sequence", "is_running", "is_paused", "session", "cycle", "position",
+    "deadline", "remaining", "started_at", "paused_seconds"
+])
+
+class Checkpoint:
+    """内存映射的检查点文件"""
+    def __init__(self, path="pomodoro_state.bin"):
+        self.path = path
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if os.fstat(fd).st_size != FILE_SIZE:
+                os.ftruncate(fd, FILE_SIZE)
+            self._map = mmap.mmap(fd, FILE_SIZE)
+        finally:
+            os.close(fd)
+        latest = self.load()
+        self._sequence = latest.sequence if latest else 0
+
+    def _read_slot(self, index):
+        """读取一个槽，CRC 不符或格式不对时返回 None"""
+        payload, crc = SLOT.unpack_from(self._map, index * SLOT.size)
+        if zlib.crc32(payload) != crc:
+            return None
+        magic, version, flags, sequence, session, cycle, position, deadline, remaining, \
+            started_at, paused_seconds = RECORD.unpack(payload)
+        if magic != MAGIC or version != VERSION or sequence == 0:
+            return None
+        return CheckpointState(sequence, bool(flags & FLAG_RUNNING), bool(flags & FLAG_PAUSED),
+                               session, cycle, position, deadline, remaining, started_at,
+                               paused_seconds)
+
+    def load(self):
+        """读取最新的有效状态，没有时返回 None"""
+        states = [s for s in (self._read_slot(0), self._read_slot(1)) if s is not None]
+        return max(states, key=lambda s: s.sequence) if states else None
+
+    def save(self, is_running, is_paused, session, cycle, position, deadline, remaining,
+             started_at, paused_seconds):
+        """写入一个新状态（覆盖较旧的槽）"""
+        self._sequence += 1
+        flags = (FLAG_RUNNING if is_running else 0) | (FLAG_PAUSED if is_paused else 0)
+        payload = RECORD.pack(MAGIC, VERSION, flags, self._sequence, session, cycle, position,
+                              deadline or 0.0, remaining, started_at or 0.0, paused_seconds)
+        offset = (self._sequence % 2) * SLOT.size
+        SLOT.pack_into(self._map, offset, payload, zlib.crc32(payload))
+        self._map.flush()
+
+    def close(self):
+        """关闭映射"""
+        self._map.close()
@@ -0,0 +1,829 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+番茄钟核心：配置、配置热加载和计时器
+不依赖 Tk，图形界面、无界面守护进程、团队同步服务和模拟共用
+"""
+
+import json
+import math
+import os
+import queue
+import sys
+import tempfile
+import threading
+import time
+from collections import namedtuple
+
+from pomodoro_effects import default_executor
+from pomodoro_metrics import REGISTRY
+from pomodoro_timeline import Timeline
+
+TICK_LATENESS = REGISTRY.histogram(
+    "pomodoro_tick_lateness_seconds", "计时循环实际唤醒时刻晚于计划时刻的时长")
+CALLBACK_SECONDS = REGISTRY.histogram(
+    "pomodoro_callback_seconds", "计时回调（状态推送）耗时")
+TIMER_THREADS = REGISTRY.gauge(
+    "pomodoro_timer_threads", "正在运行的计时线程数")
+SESSIONS_COMPLETED = REGISTRY.counter(
+    "pomodoro_sessions_completed_total", "已完成的会话数")
+CONFIG_RELOADS = REGISTRY.counter(
+    "pomodoro_config_reloads_total", "配置热加载次数")
+
+def monotonic_clock():
+    """单调时钟（秒），尽量包含系统休眠时间，避免笔记本挂起后倒计时停住"""
+    return time.clock_gettime(time.CLOCK_BOOTTIME)
+
+def _darwin_clock():
+    return time.clock_gettime(time.CLOCK_MONOTONIC)
+
+if not hasattr(time, "CLOCK_BOOTTIME"):
+    if sys.platform == "darwin":
+        # macOS 的 time.monotonic 不含睡眠时间，CLOCK_MONOTONIC 则包含
+        monotonic_clock = _darwin_clock
+    else:
+        # Windows 的 time.monotonic 本身已包含休眠时间
+        monotonic_clock = time.monotonic
+
+class PomodoroConfig:
+    """番茄钟配置管理"""
+    def __init__(self):
+        self.config_file = "pomodoro_config.json"
+        self.default_config = {
+            "work_time": 25,      # 工作时间（分钟）
+            "short_break": 5,     # 短休息时间（分钟）
+            "long_break": 15,     # 长休息时间（分钟）
+            "cycles": 4,          # 循环次数
+            "auto_lock": True,    # 工作结束后自动锁屏
+            "sound": True,        # 会话结束和结束前提醒的提示音
+            "warning_seconds": 60,  # 会话结束前多少秒播放提醒音
+            "hidden_refresh_seconds": 60  # 窗口隐藏时的刷新粒度（秒）
+        }
+        self._stamp = None  # 上次读取时配置文件的 (修改时间, 大小)
+        self.config = self.load_config()
+    
+    def validate(self, data):
+        """与默认配置合并并校验，缺失或无效的项使用默认值"""
+        config = self.default_config.copy()
+        if not isinstance(data, dict):
+            print("配置文件格式无效，使用默认配置")
+            return config
+        for key, value in data.items():
+            default = self.default_config.get(key)
+            if default is None:
+                config[key] = value  # 未知配置项原样保留
+                continue
+            if isinstance(default, bool):
+                valid = isinstance(value, bool)
+            else:
+                valid = (isinstance(value, (int, float)) and not isinstance(value, bool)
+                         and value > 0)
+                if key == "cycles":
+                    valid = valid and int(value) == value
+            if valid:
+                config[key] = value
+            else:
+                print(f"配置项 {key} 无效: {value!r}，使用默认值 {default}")
+        return config
+    
+    def _file_stamp(self):
+        """配置文件的 (修改时间, 大小)，文件不存在时为 None"""
+        try:
+            st = os.stat(self.config_file)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+    
+    def _read(self):
+        """读取并校验配置文件；文件不存在返回 None，解析失败抛出异常"""
+        self._stamp = self._file_stamp()
+        if self._stamp is None:
+            return None
+        with open(self.config_file, 'r', encoding='utf-8') as f:
+            return self.validate(json.load(f))
+    
+    def load_config(self):
+        """加载配置"""
+        try:
+            config = self._read()
+        except (OSError, ValueError) as e:
+            print(f"加载配置失败: {e}，使用默认配置")
+            config = None
+        return config if config is not None else self.default_config.copy()
+    
+    def reload_if_changed(self):
+        """配置文件变化时重新加载，返回配置是否改变
+
+        只比较文件的修改时间和大小，未变化时不读取文件；
+        解析失败时保留当前配置。
+        """
+        if self._file_stamp() == self._stamp:
+            return False
+        try:
+            config = self._read()
+        except (OSError, ValueError) as e:
+            print(f"重新加载配置失败: {e}，保留当前配置")
+            return False
+        if config is None or config == self.config:
+            return False
+        self.config = config
+        return True
+    
+    def save_config(self):
+        """保存配置（先写临时文件再原子替换，不会留下写了一半的配置）"""
+        directory = os.path.dirname(os.path.abspath(self.config_file))
+        tmp_path = None
+        try:
+            fd, tmp_path = tempfile.mkstemp(prefix=".pomodoro_config.", suffix=".tmp",
+                                            dir=directory)
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(self.config, f, indent=2, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.config_file)
+            self._stamp = self._file_stamp()
+        except Exception as e:
+            print(f"保存配置失败: {e}")
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+class ConfigWatcher:
+    """配置热加载：定期检查配置文件的修改时间，变化时才重新解析
+    
+    窗口隐藏时可用 set_interval() 放宽检查间隔以减少唤醒，恢复时立即检查一次
+    """
+    def __init__(self, config, on_change=None, interval=2.0):
+        self.config = config
+        self.on_change = on_change
+        self.interval = interval
+        self.default_interval = interval
+        self.reloads = 0
+        self._stopped = threading.Event()
+        self._wake = threading.Event()  # 间隔变化时唤醒监视线程
+        self._thread = None
+    
+    def start(self):
+        """开始监视"""
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+    
+    def stop(self):
+        """停止监视"""
+        self._stopped.set()
+        self._wake.set()
+    
+    def set_interval(self, seconds):
+        """调整检查间隔（可在任意线程调用）
+
+        缩短时立即唤醒监视线程检查一次；放宽时当前这次等待结束后生效
+        """
+        shorter = seconds < self.interval
+        self.interval = seconds
+        if shorter:
+            self._wake.set()
+    
+    def _run(self):
+        """监视线程主循环"""
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            if self._stopped.is_set():
+                return
+            if self.config.reload_if_changed():
+                self.reloads += 1
+                CONFIG_RELOADS.inc()
+                print("配置已重新加载")
+                if self.on_change:
+                    self.on_change(self.config.config)
+
+SESSION_NAMES = ("工作", "短休息", "长休息")
+SESSION_LABELS = ("🍅 工作中", "☕ 短休息", "🛌 长休息")
+WARNING_GRACE = 2.0  # 越过提醒时刻超过该秒数（跳转、挂起后）不再播放提醒音
+# 单次等待的上限（秒）：队列、条件变量和事件循环的超时按不含挂起时间的时钟计算，
+# 定期醒来按 monotonic_clock 重新检查，挂起恢复后最多再晚这么久
+MAX_WAIT = 30.0
+ERROR_RETRY = 1.0  # 推进计时出错（例如回调抛出异常）后重试的间隔（秒）
+
+_StatusFields = namedtuple("TimerStatus", [
+    "session", "cycle", "total_cycles", "remaining_time", "is_running", "is_paused"
+])
+
+class TimerStatus(_StatusFields):
+    """不可变的状态快照，兼容原来字典形式的 status["session"] 访问"""
+    __slots__ = ()
+    
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return getattr(self, key)
+        return tuple.__getitem__(self, key)
+
+_time_labels = ()  # "MM:SS" 查找表，下标为秒数
+TIME_LABEL_LIMIT = 100 * 60 - 1  # 查表只覆盖到 99:59，更长的时间现场格式化
+
+def ensure_time_labels(max_seconds):
+    """预先生成覆盖 0..max_seconds 的 "MM:SS" 文本表（最多到 TIME_LABEL_LIMIT）"""
+    global _time_labels
+    max_seconds = min(int(math.ceil(max_seconds)), TIME_LABEL_LIMIT)
+    if max_seconds >= len(_time_labels):
+        _time_labels = tuple(f"{s // 60:02d}:{s % 60:02d}" for s in range(max_seconds + 1))
+
+def time_label(seconds):
+    """格式化时间显示，常用范围直接查表"""
+    labels = _time_labels
+    if 0 <= seconds < len(labels):
+        return labels[seconds]
+    minutes = seconds // 60
+    secs = seconds % 60
+    return f"{minutes:02d}:{secs:02d}"
+
+class _Command:
+    """投递给计时器拥有者线程的一条命令"""
+    __slots__ = ("method", "args", "result", "error", "done")
+    
+    def __init__(self, method, args, done=None):
+        self.method = method
+        self.args = args
+        self.result = None
+        self.error = None
+        self.done = done  # 调用方需要等待结果时为 threading.Event
+    
+    def run(self):
+        """在拥有者线程中执行"""
+        try:
+            self.result = self.method(*self.args)
+        except Exception as e:
+            self.error = e
+            if self.done is None:
+                print(f"计时器命令 {self.method.__name__} 执行失败: {e}")
+        finally:
+            if self.done is not None:
+                self.done.set()
+
+_SHUTDOWN = object()                # 让拥有者线程退出的命令
+_OWNER_LOCK = threading.Lock()      # 保证每个计时器只创建一个拥有者线程
+
+class PomodoroTimer:
+    """番茄钟核心逻辑
+
+    倒计时基于单调时钟的截止时间（deadline）计算，而不是每秒递减计数，
+    因此回调耗时和系统挂起都不会让计时产生累积误差。
+    每次推进只做浮点比较，状态快照在内容不变时复用，时间文本查表获得。
+
+    计时器状态只由一个拥有者线程修改：start/pause/stop 等命令从其他线程调用时
+    放入命令队列，由拥有者线程依次执行，空闲时再按唤醒时刻推进计时，
+    因此每个实例任何时候最多只有一个计时循环。公开方法会等待命令执行完成；
+    Tk、托盘等不能阻塞的线程应使用 post() 投递命令。
+    使用共享调度器时调度线程就是拥有者，命令交给调度线程执行。
+    """
+    __slots__ = (
+        "config", "callback", "clock", "wall_clock", "scheduler", "history", "effects", "audio",
+        "is_running", "is_paused", "current_session", "current_cycle", "_position",
+        "deadline", "_remaining", "_last_shown", "_wake_at", "refresh_granularity",
+        "session_started_at", "paused_seconds", "_paused_at",
+        "_generation", "_commands", "_owner", "timer_thread", "_status", "checkpoint",
+        "_timeline", "_timeline_key", "_previous_left", "__weakref__"
+    )
+    
+    # post() 可投递的命令
+    COMMANDS = ("start", "pause", "toggle", "stop", "skip", "seek", "restore",
+                "reconfigure", "set_refresh_granularity")
+    
+    def __init__(self, config, callback=None, clock=monotonic_clock, scheduler=None,
+                 wall_clock=time.time):
+        self.config = config
+        self.callback = callback
+        self.clock = clock
+        self.wall_clock = wall_clock  # 墙上时间（会话开始时间、历史记录、检查点），模拟时可替换
+        self.scheduler = scheduler  # 共享调度器（为 None 时使用独立线程）
+        self.history = None         # 会话历史存储（SessionHistory，可选）
+        self.effects = None         # 副作用执行器（为 None 时使用进程共享的默认执行器）
+        self.checkpoint = None      # 状态检查点（Checkpoint，可选）
+        self.audio = None           # 提示音播放器（AudioCues，可选）
+        self.is_running = False
+        self.is_paused = False
+        self.current_session = 0  # 当前会话（0=工作，1=短休息，2=长休息）
+        self.current_cycle = 0    # 当前循环次数
+        self._position = 0        # 当前会话在时间线一轮中的位置（自定义序列中会话和循环可能重复）
+        self.deadline = None      # 当前会话结束的单调时钟时刻（运行且未暂停时有效）
+        self._remaining = 0.0     # 未在倒计时时保存的剩余时间（秒）
+        self._last_shown = None   # 上一次回调时显示的剩余秒数
+        self._wake_at = None      # 计划的下一次唤醒时刻（用于统计唤醒延迟）
+        self.refresh_granularity = 1  # 状态推送粒度（秒），界面不可见时可调大以减少唤醒
+        self.session_started_at = None  # 当前会话开始的墙上时间
+        self.paused_seconds = 0.0       # 当前会话累计暂停时长（秒）
+        self._paused_at = None
+        self._generation = 0      # 每次 start 递增，旧的计时任务据此退出（asyncio 版）
+        self._commands = queue.SimpleQueue()  # 发给拥有者线程的命令（None 表示仅唤醒）
+        self._owner = None        # 拥有者线程的标识
+        self.timer_thread = None  # 拥有者线程（首次收到命令时创建）
+        self._status = None       # 最近一次的状态快照
+        self._timeline = None     # 按配置编译的会话时间线
+        self._timeline_key = None
+        self._previous_left = None  # 上一次推进时的剩余秒数，用于判断是否越过提醒时刻
+        ensure_time_labels(self.longest_session())
+
+    @property
+    def remaining_time(self):
+        """剩余时间（秒，向上取整），由截止时间推算"""
+        if self.deadline is not None:
+            return max(0, math.ceil(self.deadline - self.clock()))
+        return max(0, math.ceil(self._remaining))
+
+    @remaining_time.setter
+    def remaining_time(self, seconds):
+        self._remaining = float(seconds)
+        if self.deadline is not None:
+            self.deadline = self.clock() + self._remaining
+        self._last_shown = None
+        
+    def _is_owner(self):
+        """当前线程是否可以直接修改计时器状态"""
+        if self.scheduler is not None:
+            return self.scheduler.in_scheduler_thread()
+        return threading.get_ident() == self._owner
+    
+    def _submit(self, command):
+        """把命令交给拥有者线程（首次提交时创建该线程）"""
+        if self.scheduler is not None:
+            self.scheduler.submit(self, command)
+            return
+        if self.timer_thread is None:
+            with _OWNER_LOCK:
+                if self.timer_thread is None:
+                    thread = threading.Thread(target=self._run_timer, name="pomodoro-timer")
+                    thread.daemon = True
+                    self.timer_thread = thread
+                    thread.start()
+        self._commands.put(command)
+    
+    def _call(self, method, *args):
+        """在拥有者线程中执行命令并等待结果"""
+        if self._is_owner():
+            return method(*args)
+        command = _Command(method, args, threading.Event())
+        self._submit(command)
+        command.done.wait()
+        if command.error is not None:
+            raise command.error
+        return command.result
+    
+    def post(self, name, *args):
+        """投递命令，不等待执行完成（供 Tk、托盘等不能阻塞的线程使用）"""
+        if name not in self.COMMANDS:
+            raise ValueError(f"未知命令: {name}")
+        method = getattr(self, "_" + name)
+        if self._is_owner():
+            method(*args)
+        else:
+            self._submit(_Command(method, args))
+    
+    def close(self, timeout=None):
+        """停止计时并结束拥有者线程（不再使用该计时器时调用）"""
+        self._call(self._stop)
+        thread = self.timer_thread
+        if thread is not None and threading.get_ident() != self._owner:
+            self._commands.put(_SHUTDOWN)
+            thread.join(timeout)
+    
+    def start(self):
+        """开始番茄钟"""
+        self._call(self._start)
+    
+    def pause(self):
+        """暂停/恢复番茄钟"""
+        self._call(self._pause)
+    
+    def toggle(self):
+        """未开始时开始，否则暂停/恢复"""
+        self._call(self._toggle)
+    
+    def stop(self):
+        """停止番茄钟"""
+        self._call(self._stop)
+    
+    def restore(self, state):
+        """从检查点恢复进度，返回是否恢复了正在进行的番茄钟"""
+        return self._call(self._restore, state)
+    
+    def skip(self, steps=1):
+        """跳到后面（steps 为负时是前面）第 steps 个会话的开头"""
+        self._call(self._skip, steps)
+    
+    def seek(self, offset):
+        """跳到计划中第 offset 秒（从一轮的第一个工作开始算）"""
+        self._call(self._seek, offset)
+    
+    def reconfigure(self):
+        """配置改变后更新派生状态（未开始时按新时长重置当前会话）"""
+        self._call(self._reconfigure)
+    
+    def set_refresh_granularity(self, seconds):
+        """设置状态推送粒度，立即按新粒度推送一次并重新计算唤醒时刻"""
+        self._call(self._set_refresh_granularity, seconds)
+    
+    def _start(self):
+        if not self.is_running:
+            self.is_running = True
+            self.is_paused = False
+            if self.remaining_time == 0:
+                self.reset_session()
+            if self.session_started_at is None:
+                self.session_started_at = self.wall_clock()
+            self.deadline = self.clock() + self._remaining
+            self._generation += 1
+            self._save_checkpoint()
+            self._launch()
+    
+    def _launch(self):
+        """开始推进计时（独立模式下拥有者线程执行完命令后会自行推进）"""
+        if self.scheduler is not None:
+            self.scheduler.schedule(self)
+    
+    def _pause(self):
+        if self.is_paused:
+            # 恢复：从保存的剩余时间重新计算截止时间
+            self.paused_seconds += self.wall_clock() - self._paused_at
+            self._paused_at = None
+            if self.is_running:
+                self.deadline = self.clock() + self._remaining
+            self.is_paused = False
+        else:
+            if self.deadline is not None:
+                self._remaining = max(0.0, self.deadline - self.clock())
+            self.deadline = None
+            self._paused_at = self.wall_clock()
+            self.is_paused = True
+        self._save_checkpoint()
+        self._notify()
+    
+    def _toggle(self):
+        if self.is_running:
+            self._pause()
+        else:
+            self._start()
+    
+    def _stop(self):
+        if self.is_running:
+            self._record_history(completed=False)
+        self.is_running = False
+        self.is_paused = False
+        self.deadline = None
+        self.remaining_time = 0
+        self.current_session = 0
+        self.current_cycle = 0
+        self._position = 0
+        self.session_started_at = None
+        self.paused_seconds = 0.0
+        self._paused_at = None
+        self._save_checkpoint()
+        self._notify()
+    
+    def _save_checkpoint(self):
+        """状态切换时写入检查点（截止时间换算为墙上时间，重启后仍然有效）"""
+        if self.checkpoint is None:
+            return
+        deadline = None
+        if self.deadline is not None:
+            deadline = self.wall_clock() + (self.deadline - self.clock())
+        try:
+            self.checkpoint.save(self.is_running, self.is_paused, self.current_session,
+                                 self.current_cycle, self._index(), deadline, self._remaining,
+                                 self.session_started_at, self.paused_seconds)
+        except (OSError, ValueError) as e:
+            print(f"保存检查点失败: {e}")
+    
+    def _restore(self, state):
+        """进程停止期间已经结束的会话会被快进跳过（不再补发通知和锁屏）"""
+        if state is None or not state.is_running or self.is_running:
+            return False
+        self.current_session = state.session
+        self.current_cycle = state.cycle
+        self._position = state.position
+        self.session_started_at = state.started_at or None
+        self.paused_seconds = state.paused_seconds
+        if state.is_paused:
+            self._remaining = state.remaining
+            self._paused_at = self.wall_clock()
+        else:
+            now = self.wall_clock()
+            self._remaining = state.deadline - now
+            if self._remaining <= 0:
+                # 在时间线上直接定位到现在所处的会话
+                timeline = self.timeline()
+                ended = timeline.slot(self._index())
+                offset = ended.end - self._remaining
+                slot = timeline.slot_at(offset)
+                self._enter(slot)
+                self.session_started_at = now - (offset - slot.start)
+                self.paused_seconds = 0.0
+                self._remaining = slot.end - offset
+        self.is_running = True
+        self.is_paused = state.is_paused
+        self.deadline = None if state.is_paused else self.clock() + self._remaining
+        self._last_shown = None
+        self._generation += 1
+        self._save_checkpoint()
+        self._launch()
+        return True
+    
+    def timeline(self):
+        """按当前配置编译的会话时间线（配置变化时重新编译）"""
+        key = Timeline.config_key(self.config.config)
+        if key != self._timeline_key:
+            self._timeline = Timeline.from_config(self.config.config)
+            self._timeline_key = key
+        return self._timeline
+    
+    def _index(self):
+        """当前会话在一轮中的位置；配置改变导致位置与会话不符时按 (会话, 循环) 重新定位"""
+        timeline = self.timeline()
+        position = self._position
+        if (not 0 <= position < len(timeline.sequence)
+                or timeline.sequence[position] != (self.current_session, self.current_cycle)):
+            position = self._position = timeline.index_of(self.current_session, self.current_cycle)
+        return position
+    
+    def _enter(self, slot):
+        """切换到时间线上的某个会话"""
+        self.current_session, self.current_cycle = slot.session, slot.cycle
+        self._position = slot.position % len(self.timeline().sequence)
+    
+    def _precise_remaining(self):
+        """当前会话的剩余时间（秒，不取整）"""
+        if self.deadline is not None:
+            return max(0.0, self.deadline - self.clock())
+        return self._remaining
+    
+    def plan_offset(self):
+        """当前时刻在时间线上的位置（相对计划起点的秒数）"""
+        slot = self.timeline().slot(self._index())
+        return slot.end - self._precise_remaining()
+    
+    def _jump(self, slot, remaining):
+        """直接切换到指定会话（不发送通知、不锁屏），未完成的当前会话计入历史"""
+        if self.is_running:
+            self._record_history(completed=False)
+        self._enter(slot)
+        ensure_time_labels(self.longest_session())
+        self.remaining_time = remaining
+        self.session_started_at = self.wall_clock() if self.is_running else None
+        self.paused_seconds = 0.0
+        self._paused_at = self.wall_clock() if self.is_paused else None
+        self._save_checkpoint()
+        self._notify()
+    
+    def _skip(self, steps=1):
+        slot = self.timeline().slot(self._index() + steps)
+        self._jump(slot, slot.end - slot.start)
+    
+    def _seek(self, offset):
+        slot = self.timeline().slot_at(offset)
+        self._jump(slot, slot.end - offset)
+    
+    def _reconfigure(self):
+        ensure_time_labels(self.longest_session())
+        if not self.is_running and self._remaining > 0:
+            self.reset_session()
+        self._last_shown = None
+        self._notify()
+    
+    def forecast(self, when):
+        """预测墙上时间 when 时所处的会话，返回的开始/结束时间为墙上时间
+
+        假设从现在起一直计时、不再暂停；未开始时按现在开始计算。
+        """
+        return self._call(self._forecast, when)
+    
+    def _forecast(self, when):
+        origin = self.wall_clock() - self.plan_offset()
+        slot = self.timeline().slot_at(when - origin)
+        return slot._replace(start=origin + slot.start, end=origin + slot.end)
+    
+    def session_duration(self, session):
+        """会话的设定时长（秒）"""
+        if session == 0:  # 工作时间
+            return self.config.config["work_time"] * 60
+        elif session == 1:  # 短休息
+            return self.config.config["short_break"] * 60
+        else:  # 长休息
+            return self.config.config["long_break"] * 60
+    
+    def longest_session(self):
+        """配置中最长会话的时长（秒）"""
+        return max(self.session_duration(session) for session in range(len(SESSION_NAMES)))
+    
+    def reset_session(self):
+        """重置当前会话（配置可能已更新，顺便扩充时间文本表）"""
+        ensure_time_labels(self.longest_session())
+        self.remaining_time = self.session_duration(self.current_session)
+        self.session_started_at = self.wall_clock() if self.is_running else None
+        self.paused_seconds = 0.0
+        self._paused_at = self.wall_clock() if self.is_paused else None
+    
+    def session_timing(self):
+        """当前会话的墙上时间统计（开始时间、暂停时长、有效计时时长）"""
+        paused = self.paused_seconds
+        if self._paused_at is not None:
+            paused += self.wall_clock() - self._paused_at
+        started = self.session_started_at
+        elapsed = self.wall_clock() - started if started is not None else 0.0
+        return {
+            "started_at": started,
+            "paused_seconds": paused,
+            "active_seconds": max(0.0, elapsed - paused)
+        }
+    
+    def _record_history(self, completed):
+        """把当前会话写入历史记录"""
+        if self.history is None or self.session_started_at is None:
+            return
+        timing = self.session_timing()
+        self.history.record(
+            session=self.current_session,
+            cycle=self.current_cycle,
+            started_at=timing["started_at"],
+            ended_at=self.wall_clock(),
+            planned_seconds=self.session_duration(self.current_session),
+            active_seconds=timing["active_seconds"],
+            paused_seconds=timing["paused_seconds"],
+            completed=completed
+        )
+    
+    def _notify(self):
+        """状态变化后唤醒计时循环，使其立即重新计算下一次唤醒时刻"""
+        if self.scheduler is not None:
+            self.scheduler.schedule(self)
+        elif threading.get_ident() != self._owner and self.timer_thread is not None:
+            self._commands.put(None)
+    
+    def _tick(self, now):
+        """推进一次计时，返回下一次需要唤醒的时钟时刻（None 表示无需唤醒）"""
+        if self._wake_at is not None and now >= self._wake_at:
+            TICK_LATENESS.observe(now - self._wake_at)
+        self._wake_at = self._advance(now)
+        return self._wake_at
+    
+    def _advance(self, now):
+        """根据当前时刻推送状态或完成会话，返回下一次唤醒时刻"""
+        if not self.is_running or self.is_paused or self.deadline is None:
+            return None
+        left = self.deadline - now
+        if left <= 0:
+            self._session_complete(now)
+            return now
+        step = self.refresh_granularity
+        shown = math.ceil(left / step)
+        if shown != self._last_shown:
+            self._last_shown = shown
+            self._emit()
+        # 睡到下一个显示粒度边界（最后一个边界就是会话截止时间）
+        wake_at = self.deadline - (shown - 1) * step
+        if self._sound_enabled():
+            # 结束前提醒：刚越过提醒时刻才播放，跳转或挂起后错过的提醒不补放
+            warning = self.config.config.get("warning_seconds", 60)
+            previous, self._previous_left = self._previous_left, left
+            if left > warning:
+                wake_at = min(wake_at, self.deadline - warning)
+            elif previous is not None and previous > warning and left > warning - WARNING_GRACE:
+                self.audio.play("warning")
+        return wake_at
+    
+    def _sound_enabled(self):
+        return self.audio is not None and self.config.config.get("sound", True)
+    
+    def _set_refresh_granularity(self, seconds):
+        if seconds != self.refresh_granularity:
+            self.refresh_granularity = seconds
+            self._last_shown = None
+            self._notify()
+    
+    def _emit(self):
+        """把当前状态推送给回调"""
+        if self.callback:
+            started = time.perf_counter()
+            self.callback(self.get_status())
+            CALLBACK_SECONDS.observe(time.perf_counter() - started)
+    
+    def _run_timer(self):
+        """拥有者线程主循环：依次执行队列中的命令，空闲时睡到下一次唤醒时刻推进计时"""
+        self._owner = threading.get_ident()
+        TIMER_THREADS.inc()
+        commands = self._commands
+        wake_at = None
+        try:
+            while True:
+                try:
+                    if wake_at is None:
+                        command = commands.get()
+                    else:
+                        timeout = min(max(0.0, wake_at - self.clock()), MAX_WAIT)
+                        command = commands.get(timeout=timeout)
+                except queue.Empty:
+                    command = None
+                if command is _SHUTDOWN:
+                    break
+                wake_at = self._step(command)
+        finally:
+            TIMER_THREADS.dec()
+            self.timer_thread = None
+            self._owner = None
+    
+    def _step(self, command=None):
+        """拥有者推进一步：执行一条命令，或 command 为 None 时到点推进计时；返回下一次唤醒时刻
+
+        回调等抛出的异常只记录，拥有者不退出；计时仍在进行时 ERROR_RETRY 秒后重试，
+        不会停在当前会话
+        """
+        try:
+            if command is None:
+                return self._tick(self.clock())
+            return self._run_command(command)
+        except Exception as e:
+            print(f"计时器推进失败: {e}")
+            if self.is_running and not self.is_paused:
+                return self.clock() + ERROR_RETRY
+            return None
+    
+    def _run_command(self, command):
+        """在拥有者线程中执行一条命令并推进计时，返回下一次唤醒时刻"""
+        self._last_shown = None
+        command.run()
+        wake_at = self._tick(self.clock())
+        if self._last_shown is None:
+            self._emit()  # 停止或暂停时计时推进不会推送，命令执行后补推一次
+        return wake_at
+    
+    def _session_complete(self, now=None):
+        """会话完成处理（now 为检测到会话结束的时钟时刻）"""
+        session_name = SESSION_NAMES[self.current_session]
+        if self._sound_enabled():
+            # 提示音最先触发，只是放入播放队列
+            self.audio.play("work_end" if self.current_session == 0 else "break_end")
+        self._record_history(completed=True)
+        
+        # 通知和锁屏交给执行器在后台完成，不阻塞计时
+        effects = self.effects if self.effects is not None else default_executor()
+        effects.submit("notify", "番茄钟提醒", f"{session_name}时间结束！")
+        
+        # 如果是工作时间结束，执行锁屏
+        if self.current_session == 0 and self.config.config.get("auto_lock", True):  # 工作时间结束且开启自动锁屏
+            effects.submit("lock")
+        
+        self._next_session()
+        
+        # 自动开始下一个会话：新截止时间接在上一个截止时间之后，不丢失处理耗时
+        previous_deadline = self.deadline
+        self.reset_session()
+        if self.is_running and previous_deadline is not None:
+            self.deadline = previous_deadline + self._remaining
+            if now is not None and self.deadline <= now:
+                self._catch_up(previous_deadline, now)
+        self._last_shown = math.ceil(self.remaining_time / self.refresh_granularity)
+        SESSIONS_COMPLETED.inc()
+        self._save_checkpoint()
+        self._emit()
+    
+    def _catch_up(self, ended_at, now):
+        """系统挂起后已经错过了后面的整个会话：直接定位到现在所处的会话
+
+        中间错过的会话不通知、不锁屏，也不计入历史（与从检查点恢复时一致）。
+        """
+        timeline = self.timeline()
+        offset = timeline.slot(self._index()).start + (now - ended_at)
+        slot = timeline.slot_at(offset)
+        self._enter(slot)
+        self._remaining = slot.end - offset
+        self.deadline = now + self._remaining
+        self.session_started_at = self.wall_clock() - (offset - slot.start)
+    
+    def _next_session(self):
+        """切换到时间线上的下一个会话"""
+        self._enter(self.timeline().slot(self._index() + 1))
+    
+    def get_status(self):
+        """获取当前状态（内容未变化时返回同一个快照对象）"""
+        # 显示循环轮次：工作中显示当前轮次+1，休息时显示已完成的轮次
+        if self.current_session == 0:  # 工作中
+            display_cycle = self.current_cycle + 1
+        else:  # 休息中，显示已完成的工作轮次
+            display_cycle = self.current_cycle
+        
+        label = SESSION_LABELS[self.current_session]
+        total_cycles = self.timeline().cycles  # 自定义序列按其中的工作会话数计
+        remaining = self.remaining_time
+        status = self._status
+        if (status is not None and status.remaining_time == remaining
+                and status.session is label and status.cycle == display_cycle
+                and status.total_cycles == total_cycles
+                and status.is_running is self.is_running
+                and status.is_paused is self.is_paused):
+            return status
+        status = self._status = TimerStatus(label, display_cycle, total_cycles, remaining,
+                                            self.is_running, self.is_paused)
+        return status
+    
+    def format_time(self, seconds):
+        """格式化时间显示"""
+        return time_label(seconds)
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+番茄钟命令行客户端
+通过本地 Unix 套接字控制 pomodoro_daemon.py，只依赖标准库中的轻量模块，
+适合在状态栏、编辑器插件和脚本中频繁调用
+
+用法:
+    python pomodoro_ctl.py status [--json]
+    python pomodoro_ctl.py start | pause | stop
+    python pomodoro_ctl.py next | prev        # 跳到下一个/上一个会话
+    python pomodoro_ctl.py subscribe          # 持续输出状态变化（每行一个 JSON）
+"""
+
+import json
+import os
+import socket
+import sys
+
+COMMANDS = ("start", "pause", "stop", "next", "prev", "status", "subscribe")
+
+def default_socket_path():
+    """守护进程套接字路径（每个用户一个）"""
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return os.path.join(runtime_dir, "pomodoro.sock")
+    return os.path.join("/tmp", f"pomodoro-{os.getuid()}.sock")
+
+def connect(path=None, timeout=2.0):
+    """连接守护进程，未运行时抛出 OSError"""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(path or default_socket_path())
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+def request(cmd, path=None):
+    """发送一条命令并返回应答"""
+    with connect(path) as sock:
+        sock.sendall(json.dumps({"cmd": cmd}).encode("utf-8") + b"\n")
+        return json.loads(sock.makefile("rb").readline())
+
+def subscribe(path=None):
+    """订阅状态推送，逐条产出"""
+    with connect(path, timeout=None) as sock:
+        sock.sendall(b'{"cmd": "subscribe"}\n')
+        for line in sock.makefile("rb"):
+            yield json.loads(line)
+
+def spawn_daemon(path=None, wait=3.0):
+    """在后台启动守护进程并等待套接字就绪"""
+    import subprocess
+    import time
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pomodoro_daemon.py")
+    cmd = [sys.executable, script]
+    if path:
+        cmd += ["--socket", path]
+    subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                     stderr=subprocess.DEVNULL, start_new_session=True)
+    give_up = time.monotonic() + wait
+    while time.monotonic() < give_up:
+        try:
+            connect(path).close()
+            return True
+        except OSError:
+            time.sleep(0.05)
+    return False
+
+def format_status(status):
+    """单行文本，如 "🍅 工作中 24:13 (1/4)" """
+    seconds = status["remaining_time"]
+    text = f"{status['session']} {seconds // 60:02d}:{seconds % 60:02d} " \
+           f"({status['cycle']}/{status['total_cycles']})"
+    if not status["is_running"]:
+        text += " 已停止"
+    elif status["is_paused"]:
+        text += " 已暂停"
+    return text
+
+def main(argv=None):
+    """主函数"""
+    argv = sys.argv[1:] if argv is None else argv
+    as_json = "--json" in argv
+    path = None
+    if "--socket" in argv:
+        path = argv[argv.index("--socket") + 1]
+    args = [a for a in argv if not a.startswith("--") and a != path]
+    cmd = args[0] if args else "status"
+    if cmd not in COMMANDS:
+        print(f"未知命令: {cmd}（可用: {', '.join(COMMANDS)}）", file=sys.stderr)
+        return 2
+
+    try:
+        if cmd == "subscribe":
+            for message in subscribe(path):
+                print(json.dumps(message, ensure_ascii=False) if as_json
+                      else format_status(message["status"]), flush=True)
+            return 0
+        try:
+            reply = request(cmd, path)
+        except OSError:
+            # 守护进程未运行：start 命令自动拉起一个实例，其他命令直接报错
+            if cmd != "start" or not spawn_daemon(path):
+                raise
+            reply = request(cmd, path)
+    except OSError as e:
+        print(f"无法连接番茄钟守护进程: {e}", file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        return 0
+
+    if as_json:
+        print(json.dumps(reply, ensure_ascii=False))
+    elif reply.get("ok"):
+        print(format_status(reply["status"]))
+    else:
+        print(f"错误: {reply.get('error')}", file=sys.stderr)
+    return 0 if reply.get("ok") else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+番茄钟无界面守护进程
+不启动 Tk 和托盘，在 asyncio 事件循环中运行计时器，
+通过本地 Unix 套接字接受命令（每行一个 JSON）:
+
+    {"cmd": "start" | "pause" | "stop" | "next" | "prev" | "status"}  -> {"ok": true, "status": {...}}
+    {"cmd": "subscribe"}  -> 持续推送 {"event": ..., "status": {...}}
+
+状态中的 deadline 是会话结束的墙上时间，订阅方可以据此自行倒计时。
+同一个套接字上只会运行一个实例（由套接字旁的锁文件保证），客户端见 pomodoro_ctl.py
+"""
+
+import argparse
+import asyncio
+import fcntl
+import json
+import os
+import signal
+import socket
+import time
+
+from pomodoro_async import AsyncPomodoroTimer
+from pomodoro_ctl import default_socket_path
+from pomodoro_core import ConfigWatcher, PomodoroConfig
+
+def status_payload(timer):
+    """可 JSON 序列化的状态（附带会话编号和墙上时间截止时刻）"""
+    payload = timer.get_status()._asdict()
+    payload["session_index"] = timer.current_session
+    payload["deadline"] = None
+    if timer.deadline is not None:
+        payload["deadline"] = time.time() + (timer.deadline - timer.clock())
+    return payload
+
+def encode(message):
+    return json.dumps(message, ensure_ascii=False).encode("utf-8") + b"\n"
+
+class PomodoroDaemon:
+    """守护进程：一个计时器，多个客户端"""
+    TITLE = "番茄钟守护进程"
+
+    def __init__(self, config, socket_path=None, max_backlog=16):
+        self.socket_path = socket_path or default_socket_path()
+        self.timer = AsyncPomodoroTimer(config)
+        self.max_backlog = max_backlog
+        self._subscribers = set()
+        self._server = None
+
+    def execute(self, cmd):
+        """执行一条控制命令"""
+        if cmd == "start":
+            if self.timer.is_running:
+                if self.timer.is_paused:
+                    self.timer.pause()
+            else:
+                self.timer.start()
+        elif cmd == "pause":
+            if self.timer.is_running:
+                self.timer.pause()
+        elif cmd == "stop":
+            self.timer.stop()
+        elif cmd == "next":
+            self.timer.skip(1)
+        elif cmd == "prev":
+            self.timer.skip(-1)
+        elif cmd != "status":
+            return {"ok": False, "error": f"未知命令: {cmd}"}
+        if cmd != "status":
+            self.broadcast(cmd)
+        return {"ok": True, "status": status_payload(self.timer)}
+
+    def broadcast(self, event):
+        """把当前状态推送给所有订阅者（积压过多时丢弃最旧的消息）"""
+        if not self._subscribers:
+            return
+        message = encode({"event": event, "status": status_payload(self.timer)})
+        for backlog in self._subscribers:
+            if backlog.full():
+                backlog.get_nowait()
+            backlog.put_nowait(message)
+
+    async def _pump_events(self):
+        """把计时事件转发给订阅者"""
+        async for event in self.timer:
+            self.broadcast(event.kind)
+
+    async def _handle(self, reader, writer):
+        """处理一个客户端连接"""
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    cmd = json.loads(line).get("cmd")
+                except (ValueError, AttributeError):
+                    writer.write(encode({"ok": False, "error": "无效请求"}))
+                    await writer.drain()
+                    continue
+                if cmd == "subscribe":
+                    await self._stream(reader, writer)
+                    break
+                writer.write(encode(self.execute(cmd)))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _stream(self, reader, writer):
+        """向订阅者持续推送状态"""
+        backlog = asyncio.Queue(self.max_backlog)
+        backlog.put_nowait(encode({"event": "status", "status": status_payload(self.timer)}))
+        self._subscribers.add(backlog)
+        try:
+            while True:
+                writer.write(await backlog.get())
+                await writer.drain()
+        finally:
+            self._subscribers.discard(backlog)
+
+    async def _listen(self):
+        """开始监听（只允许当前用户访问套接字）"""
+        server = await asyncio.start_unix_server(self._handle, path=self.socket_path)
+        os.chmod(self.socket_path, 0o600)
+        return server
+
+    def address(self):
+        """监听地址（用于显示）"""
+        return self.socket_path
+
+    def _cleanup(self):
+        """退出时删除套接字文件"""
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+    async def serve(self):
+        """运行直到收到 SIGINT/SIGTERM"""
+        self._server = await self._listen()
+        pump = asyncio.ensure_future(self._pump_events())
+        stopped = asyncio.Event()
+        loop = asyncio.get_event_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stopped.set)
+        print(f"🍅 {self.TITLE}已启动: {self.address()}", flush=True)
+        try:
+            await stopped.wait()
+        finally:
+            self.timer.stop()
+            pump.cancel()
+            self._server.close()
+            await self._server.wait_closed()
+            self._cleanup()
+
+def acquire_instance_lock(path):
+    """对套接字旁的锁文件加排他锁，成功返回需在进程退出前一直保持打开的文件，已被占用返回 None
+
+    探测和绑定套接字之前必须先持有该锁：start_unix_server 会直接删除同一路径上
+    仍在使用的套接字，两个同时启动的实例都探测不到对方时会各自运行
+    """
+    lock_file = open(path + ".lock", "a")
+    try:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return None
+    return lock_file
+
+def already_running(path):
+    """套接字上是否已有存活的实例；残留的套接字文件会被清理"""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+        return True
+    except OSError:
+        if os.path.exists(path):
+            os.unlink(path)
+        return False
+    finally:
+        sock.close()
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="番茄钟无界面守护进程")
+    parser.add_argument("--socket", help="Unix 套接字路径（默认按用户区分）")
+    args = parser.parse_args()
+
+    path = args.socket or default_socket_path()
+    lock_file = acquire_instance_lock(path)
+    if lock_file is None or already_running(path):
+        print(f"番茄钟守护进程已在运行: {path}")
+        return
+
+    config = PomodoroConfig()
+    watcher = ConfigWatcher(config)
+    watcher.start()
+    daemon = PomodoroDaemon(config, path)
+    try:
+        asyncio.run(daemon.serve())
+    finally:
+        watcher.stop()
+        lock_file.close()  # 套接字删除后才释放锁；锁文件保留，删除它会让锁失效
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+番茄钟副作用执行器
+通知和锁屏在后台线程中执行，慢的通知后端不会拖慢计时线程开始下一个会话
+
+后端只需提供 notify(title, message) 和 lock() 两个方法:
+- SystemBackend: plyer 通知 + 按平台锁屏（不经过 shell）
+- RecordingBackend: 只记录调用，用于测试
+"""
+
+import queue
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+
+from pomodoro_metrics import REGISTRY
+
+# 各动作的最长执行时间（秒），超时后不再等待
+DEFAULT_TIMEOUTS = {
+    "notify": 10.0,
+    "lock": 5.0
+}
+
+def send_notification(title, message, timeout=5):
+    """发送桌面通知（首次调用时才导入 plyer）"""
+    from plyer import notification
+    notification.notify(title=title, message=message, timeout=timeout)
+
+def lock_commands():
+    """当前平台可用的锁屏命令，按优先级排列"""
+    if sys.platform == "win32":
+        return [["rundll32.exe", "user32.dll,LockWorkStation"]]
+    if sys.platform == "darwin":
+        return [["pmset", "displaysleepnow"]]
+    return [["loginctl", "lock-session"], ["xdg-screensaver", "lock"]]
+
+class SystemBackend:
+    """真实的系统副作用"""
+    def __init__(self, command_timeout=5.0):
+        self.command_timeout = command_timeout
+
+    def notify(self, title, message):
+        """桌面通知"""
+        send_notification(title, message, timeout=5)
+
+    def lock(self):
+        """锁屏：依次尝试平台锁屏命令，直到有一个成功"""
+        errors = []
+        for cmd in lock_commands():
+            try:
+                subprocess.run(cmd, check=True, timeout=self.command_timeout,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                return
+            except (OSError, subprocess.SubprocessError) as e:
+                errors.append(f"{cmd[0]}: {e}")
+        raise RuntimeError("没有可用的锁屏命令 (" + "; ".join(errors) + ")")
+
+class RecordingBackend:
+    """测试用后端：记录调用时刻和参数，不产生真实副作用"""
+    def __init__(self, delay=0.0):
+        self.delay = delay  # 模拟慢后端
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def _record(self, *call):
+        if self.delay:
+            time.sleep(self.delay)
+        with self._lock:
+            self.calls.append((time.monotonic(),) + call)
+
+    def notify(self, title, message):
+        self._record("notify", title, message)
+
+    def lock(self):
+        self._record("lock")
+
+def lock_screen():
+    """锁定屏幕"""
+    try:
+        SystemBackend().lock()
+        print("屏幕已锁定！")
+    except Exception as e:
+        print(f"锁屏失败: {e}")
+
+class _Lane:
+    """单个动作的有界队列、工作线程和统计"""
+    def __init__(self, action, max_queue):
+        self.latency_metric = REGISTRY.histogram(
+            "pomodoro_effect_latency_seconds", "副作用从提交到执行完成的耗时", action=action)
+        self.queue = queue.Queue(max_queue)
+        self.worker = None
+        self.stuck = None   # 超时后仍未返回的调用线程
+        self.counts = {"submitted": 0, "completed": 0, "failed": 0,
+                       "timeouts": 0, "dropped": 0}
+        self.count_metrics = {
+            outcome: REGISTRY.counter("pomodoro_effects_total", "副作用按结果统计的次数",
+                                      action=action, outcome=outcome)
+            for outcome in self.counts
+        }
+        self.latencies = deque(maxlen=256)  # 提交到完成的耗时（秒）
+
+    def count(self, outcome):
+        """累加结果计数（调用方持有执行器的锁）"""
+        self.counts[outcome] += 1
+        self.count_metrics[outcome].inc()
+
+class EffectExecutor:
+    """副作用执行器
+
+    每种动作一个工作线程和一个有界队列，通知卡住不会影响锁屏。
+    每次调用在独立线程中执行并按 timeouts 等待；超时的调用不再等待，
+    在它返回之前同类动作的新请求会被丢弃，因此卡死的后端最多占用一个线程。
+    """
+    def __init__(self, backend=None, timeouts=None, max_queue=8):
+        self.backend = backend if backend is not None else SystemBackend()
+        self.timeouts = dict(DEFAULT_TIMEOUTS)
+        if timeouts:
+            self.timeouts.update(timeouts)
+        self.max_queue = max_queue
+        self._lanes = {}
+        self._lock = threading.Lock()
+
+    def submit(self, action, *args):
+        """提交一个副作用，立即返回；队列已满时丢弃并返回 False"""
+        lane = self._lane(action)
+        try:
+            lane.queue.put_nowait((time.monotonic(), args))
+        except queue.Full:
+            with self._lock:
+                lane.count("dropped")
+            return False
+        with self._lock:
+            lane.count("submitted")
+        return True
+
+    def _lane(self, action):
+        with self._lock:
+            lane = self._lanes.get(action)
+            if lane is None:
+                lane = self._lanes[action] = _Lane(action, self.max_queue)
+                lane.worker = threading.Thread(target=self._run_lane, args=(action, lane))
+                lane.worker.daemon = True
+                lane.worker.start()
+            return lane
+
+    def _run_lane(self, action, lane):
+        """工作线程主循环"""
+        timeout = self.timeouts.get(action)
+        while True:
+            item = lane.queue.get()
+            if item is None:
+                return
+            submitted_at, args = item
+            if lane.stuck is not None and lane.stuck.is_alive():
+                with self._lock:
+                    lane.count("dropped")
+                continue
+            lane.stuck = None
+
+            outcome = {}
+            def call():
+                try:
+                    getattr(self.backend, action)(*args)
+                except Exception as e:
+                    outcome["error"] = e
+
+            caller = threading.Thread(target=call)
+            caller.daemon = True
+            caller.start()
+            caller.join(timeout)
+
+            with self._lock:
+                if caller.is_alive():
+                    lane.stuck = caller
+                    lane.count("timeouts")
+                    print(f"{action} 执行超时 ({timeout}s)")
+                elif "error" in outcome:
+                    lane.count("failed")
+                    print(f"{action} 执行失败: {outcome['error']}")
+                else:
+                    lane.count("completed")
+                    lane.latencies.append(time.monotonic() - submitted_at)
+                    lane.latency_metric.observe(lane.latencies[-1])
+
+    def stats(self):
+        """各动作的计数和延迟统计（毫秒）"""
+        result = {}
+        with self._lock:
+            for action, lane in self._lanes.items():
+                latencies = sorted(lane.latencies)
+                entry = dict(lane.counts)
+                entry["queued"] = lane.queue.qsize()
+                if latencies:
+                    entry["latency_avg_ms"] = 1000 * sum(latencies) / len(latencies)
+                    entry["latency_p95_ms"] = 1000 * latencies[int(0.95 * (len(latencies) - 1))]
+                    entry["latency_max_ms"] = 1000 * latencies[-1]
+                result[action] = entry
+        return result
+
+    def shutdown(self, wait=True):
+        """停止所有工作线程（队列中已有的请求会先执行完）"""
+        with self._lock:
+            lanes = list(self._lanes.values())
+        for lane in lanes:
+            lane.queue.put(None)
+        if wait:
+            for lane in lanes:
+                lane.worker.join()
+
+_default_executor = None
+_default_lock = threading.Lock()
+
+def default_executor():
+    """进程共享的默认执行器（首次使用时创建）"""
+    global _default_executor
+    with _default_lock:
+        if _default_executor is None:
+            _default_executor = EffectExecutor()
+        return _default_executor
@@ -1,184 +1,48 @@
+import time
+_MODULE_T0 = time.perf_counter()  # 用于 --startup-profile 统计导入耗时
+
 import tkinter as tk
 from tkinter import ttk, messagebox
 import threading
-import time
-import json
 import os
+import queue
+import sys
 from datetime import datetime, timedelta
-from PIL import Image, ImageDraw
-import pystray
-from pystray import MenuItem as item
-import plyer
+from pomodoro_core import ConfigWatcher, PomodoroConfig, PomodoroTimer
+from pomodoro_metrics import REGISTRY
 
-def lock_screen():
-    """锁定Windows屏幕"""
-    try:
-        os.system('rundll32.exe user32.dll,LockWorkStation')
-        print("屏幕已锁定！")
-    except Exception as e:
-        print(f"锁屏失败: {e}")
+UI_QUEUE_DELAY = REGISTRY.histogram(
+    "pomodoro_ui_queue_delay_seconds", "状态提交到 Tk 主线程开始刷新的等待时间")
+UI_UPDATE_SECONDS = REGISTRY.histogram(
+    "pomodoro_ui_update_seconds", "_update_ui 耗时")
 
-class PomodoroConfig:
-    """番茄钟配置管理"""
-    def __init__(self):
-        self.config_file = "pomodoro_config.json"
-        self.default_config = {
-            "work_time": 25,      # 工作时间（分钟）
-            "short_break": 5,     # 短休息时间（分钟）
-            "long_break": 15,     # 长休息时间（分钟）
-            "cycles": 4,          # 循环次数
-            "auto_lock": True     # 工作结束后自动锁屏
-        }
-        self.config = self.load_config()
-    
-    def load_config(self):
-        """加载配置"""
-        try:
-            if os.path.exists(self.config_file):
-                with open(self.config_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-        except Exception:
-            pass
-        return self.default_config.copy()
-    
-    def save_config(self):
-        """保存配置"""
-        try:
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(self.config, f, indent=2, ensure_ascii=False)
-        except Exception as e:
-            print(f"保存配置失败: {e}")
+# PIL、pystray、plyer 较重，推迟到首次使用时再导入以加快启动
 
-class PomodoroTimer:
-    """番茄钟核心逻辑"""
-    def __init__(self, config, callback=None):
-        self.config = config
-        self.callback = callback
-        self.is_running = False
-        self.is_paused = False
-        self.current_session = 0  # 当前会话（0=工作，1=短休息，2=长休息）
-        self.current_cycle = 0    # 当前循环次数
-        self.remaining_time = 0   # 剩余时间（秒）
-        self.timer_thread = None
-        
-    def start(self):
-        """开始番茄钟"""
-        if not self.is_running:
-            self.is_running = True
-            self.is_paused = False
-            if self.remaining_time == 0:
-                self.reset_session()
-            self.timer_thread = threading.Thread(target=self._run_timer)
-            self.timer_thread.daemon = True
-            self.timer_thread.start()
-    
-    def pause(self):
-        """暂停/恢复番茄钟"""
-        self.is_paused = not self.is_paused
-    
-    def stop(self):
-        """停止番茄钟"""
-        self.is_running = False
-        self.is_paused = False
-        self.remaining_time = 0
-        self.current_session = 0
-        self.current_cycle = 0
-    
-    def reset_session(self):
-        """重置当前会话"""
-        if self.current_session == 0:  # 工作时间
-            self.remaining_time = self.config.config["work_time"] * 60
-        elif self.current_session == 1:  # 短休息
-            self.remaining_time = self.config.config["short_break"] * 60
-        else:  # 长休息
-            self.remaining_time = self.config.config["long_break"] * 60
-    
-    def _run_timer(self):
-        """计时器主循环"""
-        while self.is_running and self.remaining_time > 0:
-            if not self.is_paused:
-                self.remaining_time -= 1
-                if self.callback:
-                    self.callback(self.get_status())
-            time.sleep(1)
-        
-        if self.is_running and self.remaining_time <= 0:
-            self._session_complete()
-    
-    def _session_complete(self):
-        """会话完成处理"""
-        session_name = ["工作", "短休息", "长休息"][self.current_session]
-        
-        # 发送通知
-        try:
-            plyer.notification.notify(
-                title="番茄钟提醒",
-                message=f"{session_name}时间结束！",
-                timeout=5
-            )
-        except Exception:
-            pass
-        
-        # 如果是工作时间结束，执行锁屏
-        if self.current_session == 0 and self.config.config.get("auto_lock", True):  # 工作时间结束且开启自动锁屏
-            try:
-                lock_screen()
-            except Exception as e:
-                print(f"锁屏失败: {e}")
-        
-        # 切换到下一个会话
-        if self.current_session == 0:  # 工作完成
-            # 工作完成后，增加循环次数
-            self.current_cycle += 1
-            # 检查是否需要进入长休息
-            if self.current_cycle >= self.config.config["cycles"]:
-                # 完成一轮循环，进入长休息
-                self.current_session = 2
-            else:
-                # 进入短休息
-                self.current_session = 1
-        elif self.current_session == 1:  # 短休息完成，回到工作
-            self.current_session = 0
-            # 短休息完成后不改变循环次数，保持当前循环状态
-        else:  # 长休息完成，回到工作并重置循环
-            self.current_session = 0
-            # 长休息后重新开始，循环次数重置为0
-            self.current_cycle = 0
-        
-        # 自动开始下一个会话
-        self.reset_session()
-        if self.callback:
-            self.callback(self.get_status())
-        
-        # 重新启动计时器线程以继续下一个会话
-        if self.is_running:
-            self.timer_thread = threading.Thread(target=self._run_timer)
-            self.timer_thread.daemon = True
-            self.timer_thread.start()
-    
-    def get_status(self):
-        """获取当前状态"""
-        session_names = ["🍅 工作中", "☕ 短休息", "🛌 长休息"]
-        # 显示循环轮次：工作中显示当前轮次+1，休息时显示已完成的轮次
-        if self.current_session == 0:  # 工作中
-            display_cycle = self.current_cycle + 1
-        else:  # 休息中，显示已完成的工作轮次
-            display_cycle = self.current_cycle
-        
-        return {
-            "session": session_names[self.current_session],
-            "cycle": display_cycle,
-            "total_cycles": self.config.config["cycles"],
-            "remaining_time": self.remaining_time,
-            "is_running": self.is_running,
-            "is_paused": self.is_paused
-        }
+TRAY_ICON_FILE = "tomato_icon.png"  # 预先绘制好的托盘图标
+
+def resource_path(name):
+    """资源文件路径（兼容 PyInstaller 打包后的解压目录）"""
+    base = getattr(sys, "_MEIPASS", os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(base, name)
+
+def load_tray_image():
+    """加载托盘图标，缺少预制图标时才现场绘制"""
+    from PIL import Image
+    path = resource_path(TRAY_ICON_FILE)
+    if os.path.exists(path):
+        image = Image.open(path)
+        image.load()
+        return image
     
-    def format_time(self, seconds):
-        """格式化时间显示"""
-        minutes = seconds // 60
-        secs = seconds % 60
-        return f"{minutes:02d}:{secs:02d}"
+    from PIL import ImageDraw
+    image = Image.new('RGB', (64, 64), color='white')
+    draw = ImageDraw.Draw(image)
+    # 绘制番茄形状的圆形
+    draw.ellipse([8, 8, 56, 56], fill='tomato')
+    # 绘制顶部的绿色叶子
+    draw.ellipse([28, 4, 36, 16], fill='green')
+    return image
+
 
 class ConfigWindow:
     """配置窗口"""
@@ -187,9 +51,13 @@ class ConfigWindow:
         self.config = config
         self.window = None
     
+    def is_open(self):
+        """配置窗口是否正在显示"""
+        return self.window is not None and bool(self.window.winfo_exists())
+    
     def show(self):
         """显示配置窗口"""
-        if self.window and self.window.winfo_exists():
+        if self.is_open():
             self.window.lift()
             return
         
@@ -242,10 +110,18 @@ class ConfigWindow:
         ttk.Button(button_frame, text="保存", command=self.save_config).pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="取消", command=self.window.destroy).pack(side=tk.LEFT, padx=5)
         
+        # 关闭后若主窗口也已隐藏，让主线程退出 Tk 主循环
+        self.window.bind("<Destroy>", self._on_destroy)
+        
         # 居中显示
         self.window.transient(self.parent.root)
         self.window.grab_set()
     
+    def _on_destroy(self, event):
+        root = self.parent.root
+        if event.widget is self.window and root is not None:
+            root.after_idle(self.parent._leave_tk_loop_if_idle)
+    
     def save_config(self):
         """保存配置"""
         try:
@@ -258,13 +134,13 @@ class ConfigWindow:
             if work_time <= 0 or short_break <= 0 or long_break <= 0 or cycles <= 0:
                 raise ValueError("所有值必须大于0")
             
-            self.config.config["work_time"] = work_time
-            self.config.config["short_break"] = short_break
-            self.config.config["long_break"] = long_break
-            self.config.config["cycles"] = cycles
-            self.config.config["auto_lock"] = auto_lock
+            # 整体替换配置字典，计时器线程不会读到改了一半的配置
+            self.config.config = dict(self.config.config, work_time=work_time,
+                                      short_break=short_break, long_break=long_break,
+                                      cycles=cycles, auto_lock=auto_lock)
             
             self.config.save_config()
+            self.parent.timer.post("reconfigure")
             messagebox.showinfo("成功", "配置已保存！")
             self.window.destroy()
             
@@ -272,21 +148,177 @@ class ConfigWindow:
             messagebox.showerror("错误", f"配置无效: {e}")
 
 class PomodoroApp:
-    """番茄钟主应用"""
-    def __init__(self):
+    """番茄钟主应用
+
+    lazy_ui=True 时为托盘模式：启动时不创建 Tk，第一次打开主窗口或配置窗口时才在主线程中构建；
+    release_after 秒数不为 None 时，窗口隐藏超过该时长后销毁 Tk，释放界面占用的内存，
+    下次打开时重新构建。
+    """
+    def __init__(self, profile=None, lazy_ui=False, release_after=None):
+        mark = profile.mark if profile else (lambda name: None)
+        self.lazy_ui = lazy_ui
+        self.release_after = release_after
         self.config = PomodoroConfig()
         self.timer = PomodoroTimer(self.config, self.update_display)
-        
-        # 创建主窗口（隐藏）
+        self.config_watcher = ConfigWatcher(self.config, self._on_config_reloaded)
+        self.config_watcher.start()
+        mark("加载配置")
+        try:
+            from pomodoro_history import SessionHistory
+            self.timer.history = SessionHistory()
+        except Exception as e:
+            print(f"会话历史不可用: {e}")
+        mark("打开会话历史")
+        if self.config.config.get("sound", True):
+            try:
+                from pomodoro_audio import AudioCues
+                self.timer.audio = AudioCues(files=self.config.config.get("sound_files"))
+            except Exception as e:
+                print(f"提示音不可用: {e}")
+            mark("加载提示音")
+        self._init_ui_pipeline()
+        self.root = None
+        self.config_window = None
+        self._release_at = None  # 释放界面的时刻（time.monotonic()），None 表示未安排
+        self._quitting = False
+        
+        if not lazy_ui:
+            # 创建主窗口（隐藏）
+            self._build_root()
+            mark("创建Tk窗口")
+            self.setup_ui()
+        self.enter_low_power()
+        mark("构建界面")
+        self.resume_from_checkpoint()
+        mark("恢复检查点")
+        # 托盘图标在托盘线程中创建，不阻塞主窗口启动
+        
+    def resume_from_checkpoint(self):
+        """打开状态检查点，上次异常退出时从原来的进度继续"""
+        try:
+            from pomodoro_checkpoint import Checkpoint
+            self.timer.checkpoint = Checkpoint()
+        except (OSError, ValueError) as e:
+            print(f"状态检查点不可用: {e}")
+            return
+        if self.timer.restore(self.timer.checkpoint.load()):
+            self.update_display(self.timer.get_status())
+    
+    def _init_ui_pipeline(self):
+        """界面更新管线：计时线程只写入单个待处理槽位，主线程的请求队列中最多一个刷新任务"""
+        self._ui_lock = threading.Lock()
+        self._ui_requests = queue.SimpleQueue()  # 其他线程交给主线程的界面操作
+        self._tk_loop_running = False  # 主线程是否在 Tk 主循环中（受 _ui_lock 保护）
+        self.window_visible = True  # 隐藏窗口后由 enter_low_power 切换
+        self._pending_status = None
+        self._pending_since = 0.0
+        self._shown_texts = {}  # 各控件当前显示的文本
+        self.ui_stats = {
+            "coalesced": 0,  # 被后续状态覆盖、未单独刷新的更新
+            "performed": 0,  # 实际执行的控件/托盘刷新
+            "skipped": 0     # 文本未变化而跳过的控件/托盘刷新
+        }
+    
+    def _build_root(self):
+        """创建（隐藏的）Tk 主窗口"""
         self.root = tk.Tk()
         self.root.title("番茄钟")
         self.root.geometry("310x200")
         self.root.withdraw()  # 隐藏主窗口
         self.root.attributes('-topmost', True)
-        
-        self.setup_ui()
-        self.create_tray_icon()
-        
+        self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
+        self.root.bind("<<UiRequest>>", self._on_ui_request_event)
+    
+    def _ensure_ui(self):
+        """确保主窗口和控件已经构建（只在主线程调用）"""
+        if self.root is None:
+            self._build_root()
+            for key in ("session", "time", "cycle", "button"):
+                self._shown_texts.pop(key, None)  # 新控件需要重新写入文本
+            self.setup_ui()
+    
+    def _on_ui_thread(self, func):
+        """在主线程执行界面操作（可在任意线程调用）
+
+        操作一律放入 _ui_requests。主线程在 Tk 主循环中时再投递一个 <<UiRequest>>
+        虚拟事件唤醒它；窗口隐藏或界面已释放时主线程阻塞在队列上，不需要唤醒
+        """
+        self._ui_requests.put(func)
+        with self._ui_lock:
+            root = self.root if self._tk_loop_running else None
+        if root is None:
+            return
+        # 不能持锁调用：其他线程的 Tk 调用要等主线程处理，主线程可能正等着这把锁
+        try:
+            root.event_generate("<<UiRequest>>", when="tail")
+        except (tk.TclError, RuntimeError):
+            pass  # 主线程刚离开主循环，会在阻塞等待时取到这个操作
+    
+    def _ui_active(self):
+        """主窗口或配置窗口是否可见，可见时主线程需要运行 Tk 主循环（只在主线程调用）"""
+        if self.root is None:
+            return False
+        return self.window_visible or (
+            self.config_window is not None and self.config_window.is_open())
+    
+    def _drain_ui_requests(self):
+        """执行已投递的全部界面操作"""
+        while True:
+            try:
+                func = self._ui_requests.get_nowait()
+            except queue.Empty:
+                return
+            func()
+    
+    def _on_ui_request_event(self, event=None):
+        """Tk 主循环收到 <<UiRequest>>：执行已投递的操作"""
+        self._drain_ui_requests()
+        self._leave_tk_loop_if_idle()
+    
+    def _leave_tk_loop_if_idle(self):
+        """窗口都已隐藏时退出 Tk 主循环，主线程改为阻塞等待界面操作"""
+        if self.root is None or (self._ui_active() and not self._quitting):
+            return
+        with self._ui_lock:
+            self._tk_loop_running = False
+        self.root.quit()
+    
+    def _wait_ui_request(self):
+        """窗口都隐藏时阻塞等待下一个界面操作，到了释放时刻则释放界面"""
+        timeout = None
+        if self._release_at is not None:
+            timeout = max(0.0, self._release_at - time.monotonic())
+        try:
+            func = self._ui_requests.get(timeout=timeout)
+        except queue.Empty:
+            self._release_ui()
+            return
+        func()
+    
+    def _schedule_release(self):
+        """窗口隐藏后开始计时，超过 release_after 秒仍未显示则释放界面"""
+        if self.release_after is None or self.root is None:
+            return
+        self._release_at = time.monotonic() + self.release_after
+    
+    def _cancel_release(self):
+        self._release_at = None
+    
+    def _release_ui(self):
+        """销毁 Tk 主窗口和所有控件，主线程回到等待界面请求的状态"""
+        self._release_at = None
+        if self.window_visible or self.root is None:
+            return
+        if self.config_window is not None and self.config_window.is_open():
+            self._schedule_release()  # 配置窗口还开着，稍后再试
+            return
+        self._flush_ui()  # 先处理掉待处理的状态，之后的状态重新排队，不会被合并丢失
+        root = self.root
+        self.root = None
+        self.config_window = None
+        self.status_label = self.time_label = self.cycle_label = self.start_button = None
+        root.destroy()
+    
     def setup_ui(self):
         """设置UI界面"""
         # 让根窗口网格扩展，并使内容居中
@@ -317,6 +349,7 @@ class PomodoroApp:
         self.start_button.pack(side=tk.LEFT, padx=5)
         
         ttk.Button(button_frame, text="停止", command=self.stop_timer).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="跳过", command=self.skip_session).pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="配置", command=self.show_config).pack(side=tk.LEFT, padx=5)
         
         # 初始化显示
@@ -324,19 +357,20 @@ class PomodoroApp:
     
     def create_tray_icon(self):
         """创建系统托盘图标"""
-        # 创建图标
-        image = Image.new('RGB', (64, 64), color='white')
-        draw = ImageDraw.Draw(image)
-        # 绘制番茄形状的圆形
-        draw.ellipse([8, 8, 56, 56], fill='tomato')
-        # 绘制顶部的绿色叶子
-        draw.ellipse([28, 4, 36, 16], fill='green')
+        import pystray
+        from pystray import MenuItem as item
+        from pomodoro_tray import TrayFrames
+        
+        image = load_tray_image()
+        self._tray_static = image           # 未计时时显示的静态图标
+        self.tray_frames = TrayFrames()     # 计时时显示的进度帧
         
         # 创建托盘菜单
         menu = pystray.Menu(
             item('显示', self.show_window),
             item('开始/暂停', self.toggle_timer),
             item('停止', self.stop_timer),
+            item('跳过当前会话', self.skip_session),
             pystray.Menu.SEPARATOR,
             item('配置', self.show_config),
             pystray.Menu.SEPARATOR,
@@ -346,50 +380,138 @@ class PomodoroApp:
         self.tray_icon = pystray.Icon("pomodoro", image, "番茄钟", menu)
     
     def show_window(self, icon=None, item=None):
-        """显示主窗口"""
+        """显示主窗口（可在托盘线程调用）"""
+        self._on_ui_thread(self._show_window)
+    
+    def _show_window(self):
+        self._ensure_ui()
+        self._cancel_release()
         self.root.deiconify()
         self.root.lift()
         self.root.attributes('-topmost', True)
+        # 窗口可见时恢复逐秒刷新
+        self.window_visible = True
+        self.timer.post("set_refresh_granularity", 1)
+        self.config_watcher.set_interval(self.config_watcher.default_interval)
+        self.update_display(self.timer.get_status())
     
     def hide_window(self):
         """隐藏主窗口"""
         self.root.withdraw()
+        self.enter_low_power()
+        self._schedule_release()
+        self._leave_tk_loop_if_idle()
+    
+    def enter_low_power(self):
+        """低功耗模式：窗口隐藏时只在托盘标题的分钟数变化和会话结束时唤醒，
+        配置文件也按同样的间隔检查"""
+        self.window_visible = False
+        hidden_seconds = self.config.config.get("hidden_refresh_seconds", 60)
+        self.timer.post("set_refresh_granularity", hidden_seconds)
+        self.config_watcher.set_interval(hidden_seconds)
     
+    # 以下操作可能来自 Tk 或托盘线程，只投递命令不等待；
+    # 计时器执行完命令后会推送新状态，按钮文字随状态刷新
     def toggle_timer(self, icon=None, item=None):
         """切换计时器状态"""
-        if self.timer.is_running:
-            self.timer.pause()
-            self.start_button.config(text="继续" if self.timer.is_paused else "暂停")
-        else:
-            self.timer.start()
-            self.start_button.config(text="暂停")
+        self.timer.post("toggle")
     
     def stop_timer(self, icon=None, item=None):
         """停止计时器"""
-        self.timer.stop()
-        self.start_button.config(text="开始")
-        self.update_display(self.timer.get_status())
+        self.timer.post("stop")
+    
+    def skip_session(self, icon=None, item=None):
+        """跳到下一个会话"""
+        self.timer.post("skip")
     
     def show_config(self, icon=None, item=None):
-        """显示配置窗口"""
-        self.show_window()
-        config_window = ConfigWindow(self, self.config)
-        config_window.show()
+        """显示配置窗口（可在托盘线程调用）"""
+        self._on_ui_thread(self._show_config)
+    
+    def _show_config(self):
+        self._show_window()
+        if self.config_window is None:
+            self.config_window = ConfigWindow(self, self.config)
+        self.config_window.show()
     
     def update_display(self, status):
-        """更新显示"""
-        self.root.after(0, self._update_ui, status)
+        """更新显示（可在任意线程调用，未处理的状态会被合并）"""
+        with self._ui_lock:
+            scheduled = self._pending_status is not None
+            self._pending_status = status
+            if scheduled:
+                self.ui_stats["coalesced"] += 1
+            else:
+                self._pending_since = time.perf_counter()
+        if not scheduled:
+            self._on_ui_thread(self._flush_ui)
+    
+    def _flush_ui(self):
+        """取出最新的待处理状态并刷新"""
+        with self._ui_lock:
+            status = self._pending_status
+            self._pending_status = None
+            pending_since = self._pending_since
+        if status is not None:
+            started = time.perf_counter()
+            UI_QUEUE_DELAY.observe(started - pending_since)
+            self._update_ui(status)
+            UI_UPDATE_SECONDS.observe(time.perf_counter() - started)
+    
+    def _changed(self, key, text):
+        """记录控件文本，返回是否需要刷新"""
+        if self._shown_texts.get(key) == text:
+            self.ui_stats["skipped"] += 1
+            return False
+        self._shown_texts[key] = text
+        self.ui_stats["performed"] += 1
+        return True
     
     def _update_ui(self, status):
-        """在主线程中更新UI"""
-        self.status_label.config(text=status["session"])
-        self.time_label.config(text=self.timer.format_time(status["remaining_time"]))
-        self.cycle_label.config(text=f"循环: {status['cycle']}/{status['total_cycles']}")
+        """在主线程中更新UI（只刷新文本变化的控件）"""
+        time_str = self.timer.format_time(status["remaining_time"])
+        if self.window_visible:
+            cycle_text = f"循环: {status['cycle']}/{status['total_cycles']}"
+            if self._changed("session", status["session"]):
+                self.status_label.config(text=status["session"])
+            if self._changed("time", time_str):
+                self.time_label.config(text=time_str)
+            if self._changed("cycle", cycle_text):
+                self.cycle_label.config(text=cycle_text)
+            if not status["is_running"]:
+                button_text = "开始"
+            else:
+                button_text = "继续" if status["is_paused"] else "暂停"
+            if self._changed("button", button_text):
+                self.start_button.config(text=button_text)
+        else:
+            # 窗口隐藏时不刷新控件，重新显示时会立即推送一次最新状态
+            self.ui_stats["skipped"] += 4
         
-        # 更新托盘图标标题
+        # 更新托盘图标标题（低功耗模式下只显示到分钟）
         if hasattr(self, 'tray_icon'):
-            time_str = self.timer.format_time(status["remaining_time"])
-            self.tray_icon.title = f"番茄钟 - {status['session']} {time_str}"
+            if self.window_visible:
+                title = f"番茄钟 - {status['session']} {time_str}"
+            else:
+                minutes = -(-status["remaining_time"] // 60)
+                title = f"番茄钟 - {status['session']} 剩余{minutes}分钟"
+            if self._changed("tray", title):
+                self.tray_icon.title = title
+            
+            # 进度图标：只在帧号变化时切换，帧本身已预先绘制
+            session = self.timer.current_session
+            if status["is_running"]:
+                frames = self.tray_frames
+                index = frames.index_for(status["remaining_time"],
+                                         self.timer.session_duration(session))
+                if self._changed("tray_icon", frames.key(session, index)):
+                    self.tray_icon.icon = frames.get(session, index)
+            elif self._changed("tray_icon", -1):
+                self.tray_icon.icon = self._tray_static
+    
+    def _on_config_reloaded(self, config):
+        """配置文件被外部修改后通知计时器（进行中的会话不受影响，新时长从下一个会话开始生效）"""
+        self.timer.post("reconfigure")
     
     def on_closing(self):
         """窗口关闭事件"""
@@ -397,23 +519,149 @@ class PomodoroApp:
     
     def quit_app(self, icon=None, item=None):
         """退出应用"""
-        self.timer.stop()
-        self.tray_icon.stop()
-        self.root.quit()
+        self.timer.callback = None  # 退出过程中不再刷新界面
+        self.timer.close(timeout=2.0)
+        self.config_watcher.stop()
+        if hasattr(self, 'tray_icon'):
+            self.tray_icon.stop()
+        if self.timer.history is not None:
+            self.timer.history.close()
+        if self.timer.checkpoint is not None:
+            self.timer.checkpoint.close()
+        if self.timer.audio is not None:
+            self.timer.audio.close()
+        self._on_ui_thread(self._quit_ui)
+    
+    def _quit_ui(self):
+        """结束主线程的界面循环"""
+        self._quitting = True
+        if self.root is not None:
+            self.root.quit()
+    
+    def _run_tray(self):
+        """托盘线程：创建并运行托盘图标"""
+        if not hasattr(self, 'tray_icon'):
+            self.create_tray_icon()
+        self.tray_icon.run(setup=self._tray_ready)
+    
+    def _tray_ready(self, icon):
+        """托盘图标显示后，在后台预先绘制全部进度帧"""
+        icon.visible = True
+        self.tray_frames.prerender()
     
     def run(self):
         """运行应用"""
-        # 设置窗口关闭事件
-        self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
-        
         # 在单独线程中运行托盘图标
-        tray_thread = threading.Thread(target=self.tray_icon.run)
+        tray_thread = threading.Thread(target=self._run_tray)
         tray_thread.daemon = True
         tray_thread.start()
         
-        # 运行主循环
-        self.root.mainloop()
+        # 主线程：有可见窗口时运行 Tk 主循环；窗口隐藏、被释放或尚未创建时阻塞等待界面请求
+        while not self._quitting:
+            if not self._ui_active():
+                self._wait_ui_request()
+                continue
+            with self._ui_lock:
+                self._tk_loop_running = True
+            self._drain_ui_requests()  # 置位之前投递的操作没有唤醒事件
+            if self._quitting or not self._ui_active():
+                with self._ui_lock:
+                    self._tk_loop_running = False
+                continue
+            self.root.mainloop()
+            with self._ui_lock:
+                self._tk_loop_running = False
+
+class StartupProfile:
+    """启动耗时分析（--startup-profile）"""
+    def __init__(self, start):
+        self.phases = []
+        self._last = start
+    
+    def mark(self, name):
+        """记录从上一个阶段结束到现在的耗时"""
+        now = time.perf_counter()
+        self.phases.append((name, now - self._last))
+        self._last = now
+    
+    def report(self):
+        """打印各阶段耗时"""
+        total = sum(seconds for _, seconds in self.phases)
+        print("🍅 番茄钟启动耗时")
+        print("=" * 40)
+        for name, seconds in self.phases:
+            print(f"{name:<24}{seconds * 1000:>10.1f} ms")
+        print("-" * 40)
+        print(f"{'合计':<24}{total * 1000:>10.1f} ms")
+
+def profile_startup():
+    """按阶段测量启动耗时，不进入主循环"""
+    profile = StartupProfile(_MODULE_T0)
+    profile.mark("导入模块")
+    app = PomodoroApp(profile)
+    app.create_tray_icon()
+    profile.mark("托盘图标 (pystray/PIL)")
+    from plyer import notification
+    profile.mark("通知后端 (plyer)")
+    app.root.update()
+    profile.mark("首次绘制")
+    app.root.destroy()
+    profile.report()
+
+def smoke_test():
+    """不创建窗口的最小启动检查（打包后测量冷启动用），成功返回 0
+
+    除配置和计时器外还加载托盘图标、导入 pystray 和当前平台的 plyer 通知后端，
+    以发现打包时遗漏的模块；不显示托盘图标，也不发送通知
+    """
+    import importlib
+    config = PomodoroConfig()
+    timer = PomodoroTimer(config)
+    timer.get_status()
+    if not os.path.exists(resource_path(TRAY_ICON_FILE)):
+        print(f"缺少资源文件: {TRAY_ICON_FILE}")
+        return 1
+    try:
+        load_tray_image()
+        importlib.import_module("pystray")  # 导入时即选择平台后端
+        # plyer 在首次发送通知时才导入平台后端，失败也只会静默退回空实现，这里直接导入
+        from plyer.utils import platform
+        importlib.import_module(f"plyer.platforms.{platform}.notification").instance()
+    except Exception as e:
+        print(f"启动检查失败: {type(e).__name__}: {e}")
+        return 1
+    print(f"启动检查通过，用时 {(time.perf_counter() - _MODULE_T0) * 1000:.1f} ms")
+    return 0
+
+def main():
+    """主函数"""
+    import argparse
+    parser = argparse.ArgumentParser(description="番茄钟")
+    parser.add_argument("--startup-profile", action="store_true", help="按阶段测量启动耗时后退出")
+    parser.add_argument("--smoke-test", action="store_true",
+                        help="不创建窗口，加载配置和计时器后立即退出")
+    parser.add_argument("--tray-only", action="store_true",
+                        help="托盘模式：第一次打开窗口时才创建界面")
+    parser.add_argument("--release-ui-after", type=float, metavar="SECONDS",
+                        help="窗口隐藏超过 SECONDS 秒后销毁界面释放内存，下次打开时重建")
+    parser.add_argument("--metrics-file", metavar="PATH", help="定期把运行指标写入 Prometheus 文本文件")
+    parser.add_argument("--metrics-port", type=int, metavar="PORT",
+                        help="在 127.0.0.1:PORT/metrics 提供运行指标")
+    args = parser.parse_args()
+    
+    if args.smoke_test:
+        sys.exit(smoke_test())
+    if args.startup_profile:
+        profile_startup()
+        return
+    if args.metrics_file or args.metrics_port:
+        import pomodoro_metrics
+        if args.metrics_file:
+            pomodoro_metrics.start_textfile_writer(args.metrics_file)
+        if args.metrics_port:
+            pomodoro_metrics.start_http_server(args.metrics_port)
+    app = PomodoroApp(lazy_ui=args.tray_only, release_after=args.release_ui_after)
+    app.run()
 
 if __name__ == "__main__":
-    app = PomodoroApp()
-    app.run()
\ No newline at end of file
+    main()
\ No newline at end of file
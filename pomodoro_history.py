@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+番茄钟会话历史
+每次会话结束（完成或中途停止）追加一条记录到 SQLite（WAL 模式），
+写入在后台线程中批量进行；同时维护按天、按周的汇总表，
+统计查询只读汇总表，不扫描明细
+"""
+
+import queue
+import sqlite3
+import threading
+from datetime import date, datetime, timedelta
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    started_at REAL,
+    ended_at REAL NOT NULL,
+    session INTEGER NOT NULL,
+    cycle INTEGER NOT NULL,
+    planned_seconds REAL NOT NULL,
+    active_seconds REAL NOT NULL,
+    paused_seconds REAL NOT NULL,
+    completed INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_ended_at ON sessions(ended_at);
+CREATE TABLE IF NOT EXISTS daily_rollup (
+    day TEXT NOT NULL,
+    session INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    completed INTEGER NOT NULL,
+    active_seconds REAL NOT NULL,
+    PRIMARY KEY (day, session)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS weekly_rollup (
+    week TEXT NOT NULL,
+    session INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    completed INTEGER NOT NULL,
+    active_seconds REAL NOT NULL,
+    PRIMARY KEY (week, session)
+) WITHOUT ROWID;
+"""
+
+UPSERT_ROLLUP = """
+INSERT INTO {table} ({key}, session, count, completed, active_seconds)
+VALUES (?, ?, ?, ?, ?)
+ON CONFLICT ({key}, session) DO UPDATE SET
+    count = count + excluded.count,
+    completed = completed + excluded.completed,
+    active_seconds = active_seconds + excluded.active_seconds
+"""
+
+INSERT_SESSION = """
+INSERT INTO sessions (started_at, ended_at, session, cycle, planned_seconds,
+                      active_seconds, paused_seconds, completed)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+def day_key(timestamp):
+    """时间戳所在的本地日期"""
+    return datetime.fromtimestamp(timestamp).date().isoformat()
+
+def week_key(timestamp):
+    """时间戳所在周的周一日期"""
+    day = datetime.fromtimestamp(timestamp).date()
+    return (day - timedelta(days=day.weekday())).isoformat()
+
+class SessionHistory:
+    """会话历史存储
+
+    record() 只把记录放进队列，不会阻塞计时线程；
+    后台写入线程一次取出队列中积压的全部记录，在同一个事务中写入明细并更新汇总。
+    """
+    def __init__(self, path="pomodoro_history.db", batch_size=500):
+        self.path = path
+        self.batch_size = batch_size
+        self._queue = queue.Queue()
+        self._conn = self._connect()
+        self._conn.executescript(SCHEMA)
+        self._writer = threading.Thread(target=self._run_writer)
+        self._writer.daemon = True
+        self._writer.start()
+
+    def _connect(self):
+        """打开数据库连接（WAL 模式允许读写并发）"""
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def record(self, session, cycle, started_at, ended_at, planned_seconds,
+               active_seconds, paused_seconds, completed):
+        """追加一条会话记录（异步写入）"""
+        self._queue.put((started_at, ended_at, session, cycle, planned_seconds,
+                         active_seconds, paused_seconds, 1 if completed else 0))
+
+    def flush(self, timeout=None):
+        """等待此前提交的记录全部写入"""
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self):
+        """写完剩余记录并关闭"""
+        self._queue.put(None)
+        self._writer.join()
+        self._conn.close()
+
+    def _run_writer(self):
+        """写入线程主循环"""
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            rows = [item for item in batch if isinstance(item, tuple)]
+            if rows:
+                try:
+                    self._write(rows)
+                except sqlite3.Error as e:
+                    print(f"写入会话历史失败: {e}")
+            for item in batch:
+                if isinstance(item, threading.Event):
+                    item.set()
+            if None in batch:
+                return
+
+    def _write(self, rows):
+        """在一个事务中写入明细并累加汇总"""
+        daily = {}
+        weekly = {}
+        for row in rows:
+            ended_at, session, active, completed = row[1], row[2], row[5], row[7]
+            for totals, key in ((daily, day_key(ended_at)), (weekly, week_key(ended_at))):
+                count, done, seconds = totals.get((key, session), (0, 0, 0.0))
+                totals[(key, session)] = (count + 1, done + completed, seconds + active)
+        with self._conn:
+            self._conn.executemany(INSERT_SESSION, rows)
+            for table, key, totals in (("daily_rollup", "day", daily),
+                                       ("weekly_rollup", "week", weekly)):
+                self._conn.executemany(UPSERT_ROLLUP.format(table=table, key=key),
+                                       [k + v for k, v in totals.items()])
+
+    def _query(self, sql, params=()):
+        """只读查询（使用独立连接，不与写入线程争用）"""
+        conn = sqlite3.connect(self.path)
+        try:
+            return conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+
+    def focus_minutes_per_day(self, days=365, today=None):
+        """最近 days 天每天的专注（工作）分钟数，返回 [(日期, 分钟)]"""
+        today = today or date.today()
+        since = (today - timedelta(days=days - 1)).isoformat()
+        rows = self._query(
+            "SELECT day, active_seconds FROM daily_rollup "
+            "WHERE session = 0 AND day >= ? ORDER BY day", (since,))
+        return [(day, seconds / 60) for day, seconds in rows]
+
+    def weekly_summary(self, weeks=52, today=None):
+        """最近 weeks 周按会话类型的汇总，返回 [(周一日期, 会话, 次数, 完成次数, 分钟)]"""
+        today = today or date.today()
+        monday = today - timedelta(days=today.weekday())
+        since = (monday - timedelta(weeks=weeks - 1)).isoformat()
+        rows = self._query(
+            "SELECT week, session, count, completed, active_seconds FROM weekly_rollup "
+            "WHERE week >= ? ORDER BY week, session", (since,))
+        return [(week, session, count, done, seconds / 60)
+                for week, session, count, done, seconds in rows]
+
+    def sessions_between(self, start, end):
+        """时间范围内结束的会话明细（按结束时间索引）"""
+        return self._query(
+            "SELECT started_at, ended_at, session, cycle, planned_seconds, "
+            "active_seconds, paused_seconds, completed FROM sessions "
+            "WHERE ended_at >= ? AND ended_at < ? ORDER BY ended_at", (start, end))
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+番茄钟运行指标
+内置计数器、仪表和直方图，可导出为 Prometheus 文本格式：
+写入文本文件（供 node_exporter textfile collector 采集）或通过本地 HTTP 端点提供
+"""
+
+import os
+import tempfile
+import threading
+
+# 默认直方图分桶（秒）
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _format_labels(labels, extra=None):
+    """渲染标签，如 {action="lock",le="0.5"}"""
+    items = list(labels)
+    if extra:
+        items.append(extra)
+    if not items:
+        return ""
+    escaped = []
+    for key, value in items:
+        value = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        escaped.append(f'{key}="{value}"')
+    return "{" + ",".join(escaped) + "}"
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Counter:
+    """只增不减的计数器（名称按惯例以 _total 结尾）"""
+    kind = "counter"
+
+    def __init__(self):
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self):
+        return self._value
+
+    def samples(self, name, labels):
+        yield name + _format_labels(labels), self._value
+
+class Gauge:
+    """可增可减的仪表"""
+    kind = "gauge"
+
+    def __init__(self):
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def set(self, value):
+        self._value = value
+
+    def inc(self, amount=1):
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount=1):
+        self.inc(-amount)
+
+    @property
+    def value(self):
+        return self._value
+
+    def samples(self, name, labels):
+        yield name + _format_labels(labels), self._value
+
+class Histogram:
+    """固定分桶直方图"""
+    kind = "histogram"
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self._counts = [0] * len(self.buckets)
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        with self._lock:
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    self._counts[i] += 1
+                    break
+            self._sum += value
+            self._count += 1
+
+    @property
+    def count(self):
+        return self._count
+
+    def samples(self, name, labels):
+        with self._lock:
+            counts, total, count = list(self._counts), self._sum, self._count
+        cumulative = 0
+        for bound, n in zip(self.buckets, counts):
+            cumulative += n
+            yield name + "_bucket" + _format_labels(labels, ("le", _format_value(bound))), cumulative
+        yield name + "_sum" + _format_labels(labels), total
+        yield name + "_count" + _format_labels(labels), count
+
+class MetricsRegistry:
+    """指标注册表：同名同标签的指标只创建一次"""
+    def __init__(self):
+        self._families = {}  # 名称 -> (类型, 说明, {标签: 指标})
+        self._lock = threading.Lock()
+
+    def _get(self, kind, factory, name, help, labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            family = self._families.get(name)
+            if family is None:
+                family = self._families[name] = (kind, help, {})
+            elif family[0] != kind:
+                raise ValueError(f"指标 {name} 已注册为 {family[0]}")
+            metric = family[2].get(key)
+            if metric is None:
+                metric = family[2][key] = factory()
+            return metric
+
+    def counter(self, name, help, **labels):
+        """获取（或创建）计数器"""
+        return self._get(Counter.kind, Counter, name, help, labels)
+
+    def gauge(self, name, help, **labels):
+        """获取（或创建）仪表"""
+        return self._get(Gauge.kind, Gauge, name, help, labels)
+
+    def histogram(self, name, help, buckets=DEFAULT_BUCKETS, **labels):
+        """获取（或创建）直方图"""
+        return self._get(Histogram.kind, lambda: Histogram(buckets), name, help, labels)
+
+    def render(self):
+        """Prometheus 文本格式"""
+        with self._lock:
+            families = [(name, kind, help, list(metrics.items()))
+                        for name, (kind, help, metrics) in sorted(self._families.items())]
+        lines = []
+        for name, kind, help, metrics in families:
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, metric in metrics:
+                for sample, value in metric.samples(name, labels):
+                    lines.append(f"{sample} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path):
+        """原子写入文本文件"""
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(prefix=".pomodoro_metrics.", suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(self.render())
+            os.replace(tmp_path, path)
+        except Exception:
+            os.remove(tmp_path)
+            raise
+
+# 进程共享的默认注册表
+REGISTRY = MetricsRegistry()
+
+def start_textfile_writer(path, interval=15.0, registry=REGISTRY):
+    """后台线程定期把指标写入文本文件"""
+    stopped = threading.Event()
+
+    def run():
+        while True:
+            try:
+                registry.write_textfile(path)
+            except OSError as e:
+                print(f"写入指标文件失败: {e}")
+            if stopped.wait(interval):
+                return
+
+    thread = threading.Thread(target=run)
+    thread.daemon = True
+    thread.start()
+    return stopped
+
+def start_http_server(port, host="127.0.0.1", registry=REGISTRY):
+    """在本地 HTTP 端点 /metrics 上提供指标"""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] not in ("/", "/metrics"):
+                self.send_error(404)
+                return
+            body = registry.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    return server
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+番茄钟共享调度器
+用一个线程和截止时间小顶堆驱动任意数量的 PomodoroTimer，
+适合无界面的团队后端，避免每个计时器占用一个系统线程。
+调度线程同时是这些计时器的拥有者：其他线程发来的命令也在调度线程中执行
+"""
+
+import heapq
+import itertools
+import threading
+from collections import deque
+
+from pomodoro_core import MAX_WAIT, monotonic_clock
+
+class TimerScheduler:
+    """单线程计时器调度器
+
+    堆中保存 (唤醒时刻, 序号, 计时器)。计时器被重新调度时旧条目不会删除，
+    而是在弹出时根据序号判断是否已失效（惰性删除），调度操作保持 O(log n)。
+    submit() 提交的命令优先于到期的计时器执行。
+    """
+    def __init__(self, clock=monotonic_clock):
+        self.clock = clock
+        self._heap = []
+        self._pending = {}       # 计时器 -> 当前有效条目的序号
+        self._counter = itertools.count()
+        self._commands = deque()  # (计时器, 命令)
+        self._cond = threading.Condition()
+        self._running = False
+        self._thread = None
+
+    def __len__(self):
+        """当前已调度的计时器数量"""
+        with self._cond:
+            return len(self._pending)
+
+    def schedule(self, timer, when=None):
+        """安排计时器在 when（时钟时刻，默认立即）推进一次"""
+        if when is None:
+            when = self.clock()
+        with self._cond:
+            seq = next(self._counter)
+            self._pending[timer] = seq
+            heapq.heappush(self._heap, (when, seq, timer))
+            # 只有新条目成为堆顶时才需要唤醒调度线程
+            if self._heap[0][1] == seq:
+                self._cond.notify()
+
+    def submit(self, timer, command):
+        """把计时器命令交给调度线程执行"""
+        with self._cond:
+            self._commands.append((timer, command))
+            self._cond.notify()
+
+    def in_scheduler_thread(self):
+        """当前线程能否直接修改计时器状态（调度线程本身，或调度线程尚未启动）"""
+        thread = self._thread
+        return thread is None or threading.get_ident() == thread.ident
+
+    def cancel(self, timer):
+        """取消计时器的调度"""
+        with self._cond:
+            self._pending.pop(timer, None)
+
+    def start(self):
+        """启动调度线程"""
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """停止调度线程"""
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _next_due(self):
+        """取出一条待执行的命令或一个已到期的有效计时器；调用方需持有锁"""
+        while self._running:
+            if self._commands:
+                return self._commands.popleft()
+            if not self._heap:
+                self._cond.wait()
+                continue
+            when, seq, timer = self._heap[0]
+            if self._pending.get(timer) != seq:
+                heapq.heappop(self._heap)  # 已失效的旧条目
+                continue
+            delay = when - self.clock()
+            if delay > 0:
+                self._cond.wait(min(delay, MAX_WAIT))
+                continue
+            heapq.heappop(self._heap)
+            del self._pending[timer]
+            return timer, None
+        return None
+
+    def _run(self):
+        """调度主循环"""
+        while True:
+            with self._cond:
+                item = self._next_due()
+            if item is None:
+                return
+            timer, command = item
+            wake_at = timer._step(command)  # 出错时只记录，并安排重试
+            if wake_at is not None:
+                self.schedule(timer, wake_at)
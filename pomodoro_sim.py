@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+番茄钟快进模拟
+用虚拟时钟驱动 PomodoroTimer：时间不靠 sleep 流逝，而是直接跳到下一次唤醒时刻，
+几周的会话（包括暂停、跳过和配置修改）在毫秒级完成，并得到可逐条比对的切换记录。
+通知、锁屏和提示音只记录到轨迹中，不会真正执行
+
+用法:
+    sim = Simulation(PomodoroConfig())
+    sim.at(0, "start")
+    sim.at(3600, "pause")
+    sim.at(3900, "pause")                      # 再次 pause 即恢复
+    sim.at(86400, "config", {"work_time": 50})
+    sim.run_for(7 * 86400)
+    print(sim.format_trace())
+
+命令行:
+    python pomodoro_sim.py --days 7
+"""
+
+import heapq
+import itertools
+import time
+from collections import namedtuple
+from datetime import datetime
+
+from pomodoro_core import PomodoroTimer
+
+DEFAULT_EPOCH = datetime(2024, 1, 1).timestamp()  # 模拟从本地时间某天零点开始，固定值保证结果可复现
+QUIET_GRANULARITY = 24 * 3600  # 模拟中不需要逐秒推送，只在状态切换时记录
+
+# at: 模拟开始后的秒数；kind: "command" / "session" / "effect"；detail: 具体内容
+TraceEvent = namedtuple("TraceEvent", ["at", "kind", "detail"])
+
+class VirtualClock:
+    """虚拟时钟：调用返回单调时间，wall() 返回对应的墙上时间"""
+    def __init__(self, epoch=DEFAULT_EPOCH):
+        self.now = 0.0
+        self.epoch = epoch
+
+    def __call__(self):
+        return self.now
+
+    def wall(self):
+        return self.epoch + self.now
+
+    def advance_to(self, when):
+        """把时间推进到 when（不会倒退）"""
+        if when > self.now:
+            self.now = when
+
+class CapturedEffects:
+    """代替 EffectExecutor 和 AudioCues：通知、锁屏和提示音只记入模拟轨迹"""
+    def __init__(self, simulation):
+        self.simulation = simulation
+
+    def submit(self, action, *args):
+        self.simulation.record("effect", (action,) + args)
+        return True
+
+    def play(self, name):
+        self.simulation.record("effect", ("sound", name))
+        return True
+
+class Simulation:
+    """单线程、确定性的快进模拟
+
+    对计时器来说它就是一个共享调度器（提供 schedule），所以命令在调用线程中直接执行，
+    计时推进只发生在 run_until 里按时间顺序处理的事件上。
+    同一时刻先处理计时器的唤醒（会话按时结束），再执行脚本中的命令。
+    """
+    def __init__(self, config, epoch=DEFAULT_EPOCH, history=None):
+        self.config = config
+        self.clock = VirtualClock(epoch)
+        self.trace = []
+        self._queue = []        # (时刻, 类别, 序号, 内容)；类别 0 为计时器唤醒，1 为脚本命令
+        self._pending = {}      # 计时器 -> 当前有效唤醒条目的序号
+        self._counter = itertools.count()
+        self._last = {}
+        self.timer = self.add_timer(history)
+
+    def add_timer(self, history=None):
+        """创建一个由本模拟驱动的计时器"""
+        timer = PomodoroTimer(self.config, None, self.clock, self, self.clock.wall)
+        timer.callback = lambda status, timer=timer: self._observe(timer, status)
+        timer.effects = timer.audio = CapturedEffects(self)
+        timer.history = history
+        timer.set_refresh_granularity(QUIET_GRANULARITY)
+        return timer
+
+    # 调度器接口（PomodoroTimer 在 start/状态变化时调用）
+    def schedule(self, timer, when=None):
+        seq = next(self._counter)
+        self._pending[timer] = seq
+        heapq.heappush(self._queue, (self.clock() if when is None else when, 0, seq, timer))
+
+    def cancel(self, timer):
+        self._pending.pop(timer, None)
+
+    def in_scheduler_thread(self):
+        return True  # 单线程模拟，命令总是直接执行
+
+    def at(self, offset, command, *args):
+        """安排在模拟开始后 offset 秒执行命令
+
+        command 为计时器命令（start、pause、stop、skip、seek 等），
+        或 "config"：用给定的字典更新配置后通知计时器。
+        """
+        if command != "config" and command not in PomodoroTimer.COMMANDS:
+            raise ValueError(f"未知命令: {command}")
+        heapq.heappush(self._queue, (offset, 1, next(self._counter), (command, args)))
+
+    def record(self, kind, detail):
+        """追加一条轨迹"""
+        self.trace.append(TraceEvent(self.clock(), kind, detail))
+
+    def _observe(self, timer, status):
+        """计时器推送状态时只记录会话/运行状态的变化"""
+        key = (status.session, status.cycle, status.is_running, status.is_paused)
+        if self._last.get(timer) != key:
+            self._last[timer] = key
+            self.record("session", key)
+
+    def _run_command(self, command, args):
+        self.record("command", (command,) + args)
+        if command == "config":
+            self.config.config = dict(self.config.config, **args[0])
+            self.timer.reconfigure()
+        else:
+            getattr(self.timer, command)(*args)
+        self._observe(self.timer, self.timer.get_status())  # 暂停、停止不会触发推送
+
+    def run_until(self, until):
+        """按时间顺序处理 until 之前（含）的唤醒和命令，返回处理的事件数"""
+        handled = 0
+        queue = self._queue
+        while queue and queue[0][0] <= until:
+            when, kind, seq, item = heapq.heappop(queue)
+            if kind == 0 and self._pending.get(item) != seq:
+                continue  # 已被重新调度的旧条目
+            self.clock.advance_to(when)
+            handled += 1
+            if kind == 1:
+                self._run_command(*item)
+                continue
+            del self._pending[item]
+            wake_at = item._tick(self.clock())
+            if wake_at is not None and item not in self._pending:
+                self.schedule(item, wake_at)
+        self.clock.advance_to(until)
+        return handled
+
+    def run_for(self, seconds):
+        """从当前虚拟时间再运行 seconds 秒"""
+        return self.run_until(self.clock() + seconds)
+
+    def format_trace(self):
+        """可读的轨迹文本（墙上时间按模拟时间换算）"""
+        lines = []
+        for event in self.trace:
+            stamp = datetime.fromtimestamp(self.clock.epoch + event.at).strftime("%m-%d %H:%M:%S")
+            lines.append(f"{stamp}  {event.kind:<8}{' '.join(str(d) for d in event.detail)}")
+        return "\n".join(lines)
+
+def weekly_script(simulation, days):
+    """示例脚本：每天 9 点开始、12 点暂停一小时、18 点停止，第二天起工作时长改为 50 分钟"""
+    for day in range(days):
+        base = day * 86400
+        simulation.at(base + 9 * 3600, "start")
+        simulation.at(base + 12 * 3600, "pause")
+        simulation.at(base + 13 * 3600, "pause")
+        simulation.at(base + 18 * 3600, "stop")
+    if days > 1:
+        simulation.at(86400 + 8 * 3600, "config", {"work_time": 50})
+
+def main():
+    """主函数"""
+    import argparse
+    from pomodoro_core import PomodoroConfig
+
+    parser = argparse.ArgumentParser(description="番茄钟快进模拟")
+    parser.add_argument("--days", type=int, default=7, help="模拟的天数")
+    parser.add_argument("--trace", action="store_true", help="输出完整切换轨迹")
+    args = parser.parse_args()
+
+    config = PomodoroConfig()
+    config.config = dict(config.config)  # 模拟中修改配置不影响配置文件
+    sim = Simulation(config)
+    weekly_script(sim, args.days)
+    started = time.perf_counter()
+    handled = sim.run_for(args.days * 86400)
+    elapsed = time.perf_counter() - started
+
+    if args.trace:
+        print(sim.format_trace())
+    sessions = sum(1 for e in sim.trace if e.kind == "session")
+    effects = [e for e in sim.trace if e.kind == "effect"]
+    print(f"🍅 模拟 {args.days} 天: {handled} 个事件, {sessions} 次状态切换, "
+          f"{len(effects)} 次通知/锁屏, 用时 {elapsed * 1000:.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+番茄钟团队同步服务
+一个计时器，通过 TCP 广播给局域网内的整个团队（每行一个 JSON）。
+订阅后先收到完整快照，之后只在状态切换（开始、暂停、停止、会话结束、跳过）时
+收到变化的字段；状态中带有会话结束的墙上时间 deadline，客户端自行倒计时，
+服务端不做逐秒推送:
+
+    -> {"cmd": "subscribe"}
+    <- {"type": "snapshot", "version": 1, "server_time": ..., "state": {...}}
+    <- {"type": "delta", "version": 2, "server_time": ..., "event": "start", "changes": {...}}
+
+version 连续递增，客户端发现跳号时应重新订阅。订阅后仍可在同一连接上发送
+start/pause/stop/next/prev 命令（只读模式下拒绝）。发送缓冲积压过多的订阅者会被断开，
+重新连接即可拿到最新快照。
+
+用法:
+    python pomodoro_sync.py serve [--host 0.0.0.0] [--port 8765] [--read-only]
+    python pomodoro_sync.py follow [--connect HOST:PORT]    # 本地倒计时显示
+    python pomodoro_sync.py start | pause | stop | next | prev [--connect HOST:PORT]
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import socket
+import sys
+import time
+
+from pomodoro_ctl import format_status
+from pomodoro_daemon import PomodoroDaemon, encode
+
+DEFAULT_PORT = 8765
+QUIET_GRANULARITY = 24 * 3600  # 计时循环只在会话结束时唤醒
+
+class SyncServer(PomodoroDaemon):
+    """团队同步服务：增量广播 + 截止时间，客户端本地倒计时"""
+    TITLE = "番茄钟团队同步服务"
+
+    def __init__(self, config, host="127.0.0.1", port=DEFAULT_PORT, allow_control=True,
+                 max_buffer=64 * 1024):
+        super().__init__(config)
+        self.host = host
+        self.port = port
+        self.allow_control = allow_control
+        self.max_buffer = max_buffer  # 单个订阅者允许积压的发送字节数
+        self.version = 0
+        self.dropped = 0
+        self._state = {}
+        self._deadline = None       # 已换算过的单调时钟截止时间
+        self._wall_deadline = None  # 对应的墙上时间
+        self.timer.set_refresh_granularity(QUIET_GRANULARITY)
+
+    def state(self):
+        """共享状态；倒计时中只给出截止时间，不给出每秒变化的剩余秒数"""
+        timer = self.timer
+        status = timer.get_status()
+        if timer.deadline != self._deadline:
+            # 截止时间只在变化时换算一次，避免换算误差产生无意义的增量
+            self._deadline = timer.deadline
+            self._wall_deadline = None
+            if timer.deadline is not None:
+                self._wall_deadline = round(time.time() + (timer.deadline - timer.clock()), 3)
+        return {
+            "session": timer.current_session,
+            "label": status.session,
+            "cycle": status.cycle,
+            "total_cycles": status.total_cycles,
+            "is_running": status.is_running,
+            "is_paused": status.is_paused,
+            "deadline": self._wall_deadline,
+            "remaining": None if self._wall_deadline is not None else status.remaining_time
+        }
+
+    def execute(self, cmd):
+        """执行控制命令（只读模式下只接受 status）"""
+        if cmd != "status" and not self.allow_control:
+            return {"ok": False, "error": "只读模式，不接受控制命令"}
+        return super().execute(cmd)
+
+    def broadcast(self, event):
+        """只把变化的字段广播给订阅者，消息只编码一次"""
+        state = self.state()
+        changes = {key: value for key, value in state.items() if self._state.get(key) != value}
+        if not changes:
+            return
+        self._state = state
+        self.version += 1
+        if not self._subscribers:
+            return
+        message = encode({"type": "delta", "version": self.version,
+                          "server_time": time.time(), "event": event, "changes": changes})
+        for writer in list(self._subscribers):
+            self._send(writer, message)
+
+    def _send(self, writer, message):
+        """写入发送缓冲；积压超过上限的慢订阅者直接断开（增量不能丢弃，只能重新订阅）"""
+        if writer.transport.get_write_buffer_size() > self.max_buffer:
+            self._subscribers.discard(writer)
+            self.dropped += 1
+            writer.close()
+            return
+        writer.write(message)
+
+    async def _stream(self, reader, writer):
+        """发送快照后登记订阅者，此后连接上的命令照常执行"""
+        self.broadcast("status")  # 确保快照与之后的增量版本号衔接
+        writer.write(encode({"type": "snapshot", "version": self.version,
+                             "server_time": time.time(), "state": self._state}))
+        self._subscribers.add(writer)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    cmd = json.loads(line).get("cmd")
+                except (ValueError, AttributeError):
+                    continue
+                reply = self.execute(cmd)
+                if not reply["ok"]:
+                    self._send(writer, encode(reply))
+        finally:
+            self._subscribers.discard(writer)
+
+    async def _listen(self):
+        """监听 TCP 端口"""
+        server = await asyncio.start_server(self._handle, self.host, self.port, backlog=1024)
+        self.port = server.sockets[0].getsockname()[1]
+        return server
+
+    def address(self):
+        return f"{self.host}:{self.port}"
+
+    def _cleanup(self):
+        pass
+
+def parse_address(text):
+    """解析 "HOST:PORT" 或 "HOST"，缺省为本机默认端口"""
+    if not text:
+        return "127.0.0.1", DEFAULT_PORT
+    host, sep, port = text.rpartition(":")
+    if not sep:
+        return text, DEFAULT_PORT
+    return host or "127.0.0.1", int(port)
+
+def follow(host="127.0.0.1", port=DEFAULT_PORT):
+    """订阅并在本地合并增量，每次状态变化产出 (状态, 服务端与本机的时钟差)"""
+    with socket.create_connection((host, port)) as sock:
+        sock.sendall(b'{"cmd": "subscribe"}\n')
+        state = None
+        version = 0
+        for line in sock.makefile("rb"):
+            message = json.loads(line)
+            kind = message.get("type")
+            if kind == "snapshot":
+                state = dict(message["state"])
+            elif kind == "delta" and state is not None:
+                if message["version"] != version + 1:
+                    raise ConnectionError(f"增量版本不连续: {version} -> {message['version']}")
+                state.update(message["changes"])
+            else:
+                print(f"错误: {message.get('error')}", file=sys.stderr)
+                continue
+            version = message["version"]
+            yield state, message["server_time"] - time.time()
+
+def remaining_seconds(state, offset=0.0):
+    """按截止时间在本地计算剩余秒数（offset 为服务端时钟减本机时钟）"""
+    if state["deadline"] is None:
+        return state["remaining"] or 0
+    return max(0, math.ceil(state["deadline"] - offset - time.time()))
+
+def show_countdown(host, port):
+    """跟随团队计时器，在终端本地逐秒刷新"""
+    import threading
+    latest = {}
+    changed = threading.Event()
+
+    def receive():
+        try:
+            for state, offset in follow(host, port):
+                latest["state"], latest["offset"] = dict(state), offset
+                changed.set()
+            latest["error"] = "服务端关闭了连接"
+        except (OSError, ConnectionError) as e:
+            latest["error"] = e
+        changed.set()
+
+    thread = threading.Thread(target=receive)
+    thread.daemon = True
+    thread.start()
+    while "error" not in latest:
+        changed.wait(1.0)
+        changed.clear()
+        if "state" in latest:
+            state = latest["state"]
+            status = {"session": state["label"], "cycle": state["cycle"],
+                      "total_cycles": state["total_cycles"], "is_running": state["is_running"],
+                      "is_paused": state["is_paused"],
+                      "remaining_time": remaining_seconds(state, latest["offset"])}
+            print("\r" + format_status(status) + "    ", end="", flush=True)
+    print(f"\n连接已断开: {latest['error']}", file=sys.stderr)
+    return 1
+
+def send_command(cmd, host, port):
+    """发送一条控制命令并打印结果"""
+    with socket.create_connection((host, port), timeout=5.0) as sock:
+        sock.sendall(json.dumps({"cmd": cmd}).encode("utf-8") + b"\n")
+        reply = json.loads(sock.makefile("rb").readline())
+    if reply.get("ok"):
+        print(format_status(reply["status"]))
+        return 0
+    print(f"错误: {reply.get('error')}", file=sys.stderr)
+    return 1
+
+def main(argv=None):
+    """主函数"""
+    parser = argparse.ArgumentParser(description="番茄钟团队同步服务")
+    parser.add_argument("action", choices=["serve", "follow", "start", "pause", "stop",
+                                           "next", "prev", "status"])
+    parser.add_argument("--host", default="127.0.0.1",
+                        help="serve 的监听地址（局域网共享用 0.0.0.0）")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="serve 的监听端口")
+    parser.add_argument("--read-only", action="store_true", help="serve 时不接受客户端的控制命令")
+    parser.add_argument("--connect", metavar="HOST:PORT", help="客户端连接的服务地址")
+    args = parser.parse_args(argv)
+
+    if args.action == "serve":
+        from pomodoro_core import PomodoroConfig
+        server = SyncServer(PomodoroConfig(), args.host, args.port,
+                            allow_control=not args.read_only)
+        asyncio.run(server.serve())
+        return 0
+
+    host, port = parse_address(args.connect)
+    try:
+        if args.action == "follow":
+            return show_countdown(host, port)
+        return send_command(args.action, host, port)
+    except OSError as e:
+        print(f"无法连接团队同步服务: {e}", file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
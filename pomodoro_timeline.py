@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+番茄钟会话时间线
+把配置（工作/休息时长、循环次数或自定义会话序列）预先编译成覆盖一整天的
+会话边界表，"下一个/上一个会话"、"跳到第 T 秒"、"15:40 时在做什么"
+都只需查表和二分查找，不再依赖分支逻辑逐个推演
+
+自定义序列写在配置文件的 "sequence" 项中，例如:
+
+    "sequence": ["work", "short_break", "work", "work", "long_break"]
+"""
+
+import bisect
+import math
+from collections import namedtuple
+
+WORK, SHORT_BREAK, LONG_BREAK = 0, 1, 2
+SESSION_KINDS = {"work": WORK, "short_break": SHORT_BREAK, "long_break": LONG_BREAK}
+DURATION_KEYS = ("work_time", "short_break", "long_break")  # 各会话时长对应的配置项（分钟）
+DAY_SECONDS = 24 * 3600
+
+# position 为时间线上的绝对序号（可跨轮、可为负），start/end 为相对计划起点的秒数
+Slot = namedtuple("Slot", ["position", "session", "cycle", "start", "end"])
+
+def default_sequence(cycles):
+    """标准番茄钟序列：每次工作后短休息，最后一次工作后长休息"""
+    sequence = []
+    for cycle in range(cycles):
+        sequence.append((WORK, cycle))
+        if cycle + 1 < cycles:
+            sequence.append((SHORT_BREAK, cycle + 1))
+        else:
+            sequence.append((LONG_BREAK, cycles))
+    return sequence
+
+def parse_sequence(names):
+    """把会话名列表转换为 (会话, 循环) 列表；循环数为本轮已完成的工作次数"""
+    sequence = []
+    done = 0
+    for name in names:
+        session = SESSION_KINDS[name]
+        sequence.append((session, done))
+        if session == WORK:
+            done += 1
+    if not sequence:
+        raise ValueError("空序列")
+    return sequence
+
+class Timeline:
+    """一轮会话序列及其展开到一整天的边界表"""
+    def __init__(self, sequence, durations, horizon=DAY_SECONDS):
+        self.sequence = tuple(sequence)
+        self.durations = tuple(durations)  # 各类会话时长（秒）
+        self.cycles = sum(1 for session, _ in self.sequence if session == WORK)
+        self.period = sum(self.durations[session] for session, _ in self.sequence)
+        self._positions = {}
+        for index, entry in enumerate(self.sequence):
+            self._positions.setdefault(entry, index)
+
+        rounds = max(1, math.ceil(horizon / self.period))
+        self.starts = []  # 每个会话的开始时刻（秒），单调递增，供二分查找
+        offset = 0
+        for _ in range(rounds):
+            for session, _ in self.sequence:
+                self.starts.append(offset)
+                offset += self.durations[session]
+        self.span = offset
+
+    @staticmethod
+    def config_key(config):
+        """决定时间线形状的配置项，用于判断是否需要重新编译"""
+        return tuple(config[key] for key in DURATION_KEYS) + (
+            config["cycles"], repr(config.get("sequence")))
+
+    @classmethod
+    def from_config(cls, config, horizon=DAY_SECONDS):
+        """根据配置字典编译时间线，自定义序列无效时使用标准序列"""
+        durations = tuple(config[key] * 60 for key in DURATION_KEYS)
+        names = config.get("sequence")
+        sequence = None
+        if names is not None:
+            try:
+                sequence = parse_sequence(names)
+            except (KeyError, TypeError, ValueError):
+                print(f"自定义会话序列无效: {names!r}，使用标准序列")
+        if sequence is None:
+            sequence = default_sequence(int(config["cycles"]))
+        return cls(sequence, durations, horizon)
+
+    def index_of(self, session, cycle):
+        """(会话, 循环) 在一轮中的位置
+
+        自定义序列中同一 (会话, 循环) 可能出现多次，此时取第一个；计时器自己记录位置，
+        只在位置失效（如序列被修改）时用它重新定位。
+        配置改变后当前状态可能不在新序列中，此时取同类会话中循环数不超过它的最后一个。
+        """
+        index = self._positions.get((session, cycle))
+        if index is None:
+            candidates = [i for i, (s, c) in enumerate(self.sequence)
+                          if s == session and c <= cycle]
+            index = candidates[-1] if candidates else 0
+        return index
+
+    def slot(self, position):
+        """时间线上第 position 个会话（可超出一天或为负，按轮次周期推算）"""
+        rounds, index = divmod(position, len(self.sequence))
+        session, cycle = self.sequence[index]
+        start = rounds * self.period + self.starts[index]
+        return Slot(position, session, cycle, start, start + self.durations[session])
+
+    def slot_at(self, offset):
+        """相对计划起点 offset 秒时所处的会话（二分查找）"""
+        rounds = 0
+        if not 0 <= offset < self.span:
+            rounds = math.floor(offset / self.period)
+            offset -= rounds * self.period
+        position = bisect.bisect_right(self.starts, offset) - 1
+        return self.slot(rounds * len(self.sequence) + position)
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+番茄钟托盘进度图标
+每种会话预先绘制固定数量的进度环帧，放在有界的 LRU 缓存中；
+计时时只计算帧号，帧号变化才切换托盘图标，不在每秒重新绘制
+"""
+
+import threading
+from collections import OrderedDict
+
+FRAME_STEPS = 60   # 每种会话的进度帧数
+FRAME_SIZE = 64    # 图标边长（像素）
+SUPERSAMPLE = 4    # 放大绘制后缩小，得到平滑的圆环
+
+# 会话颜色（工作、短休息、长休息）
+SESSION_COLORS = ("tomato", "mediumseagreen", "royalblue")
+TRACK_COLOR = (220, 220, 220, 255)
+
+def render_frame(session, step, steps=FRAME_STEPS, size=FRAME_SIZE):
+    """绘制一帧：中心为会话颜色的圆，外圈进度环显示已用时间比例"""
+    from PIL import Image, ImageDraw
+
+    big = size * SUPERSAMPLE
+    image = Image.new("RGBA", (big, big), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(image)
+    color = SESSION_COLORS[session]
+    pad = big // 16
+    ring = big // 9
+    box = [pad, pad, big - pad - 1, big - pad - 1]
+    draw.ellipse(box, outline=TRACK_COLOR, width=ring)
+    if step > 0:
+        draw.arc(box, start=-90, end=-90 + 360 * step / steps, fill=color, width=ring)
+    inner = pad + ring + big // 20
+    draw.ellipse([inner, inner, big - inner - 1, big - inner - 1], fill=color)
+    return image.resize((size, size), Image.LANCZOS)
+
+class TrayFrames:
+    """进度帧缓存（LRU，容量默认正好容纳全部会话的帧）"""
+    def __init__(self, steps=FRAME_STEPS, size=FRAME_SIZE, max_frames=None, render=render_frame):
+        self.steps = steps
+        self.size = size
+        self.max_frames = max_frames or steps * len(SESSION_COLORS)
+        self.render = render
+        self.hits = 0
+        self.misses = 0
+        self._frames = OrderedDict()
+        self._lock = threading.Lock()
+
+    def index_for(self, remaining, duration):
+        """根据剩余时间计算帧号（0..steps-1）"""
+        if duration <= 0:
+            return 0
+        elapsed = duration - remaining
+        return max(0, min(self.steps - 1, int(elapsed * self.steps / duration)))
+
+    def key(self, session, index):
+        """帧的整数键，便于比较是否需要切换图标"""
+        return session * self.steps + index
+
+    def get(self, session, index):
+        """取出一帧，缓存中没有时才绘制"""
+        key = self.key(session, index)
+        with self._lock:
+            image = self._frames.get(key)
+            if image is not None:
+                self._frames.move_to_end(key)
+                self.hits += 1
+                return image
+            self.misses += 1
+        image = self.render(session, index, self.steps, self.size)
+        with self._lock:
+            self._frames[key] = image
+            while len(self._frames) > self.max_frames:
+                self._frames.popitem(last=False)
+        return image
+
+    def prerender(self, sessions=(0, 1, 2)):
+        """预先绘制指定会话的全部帧（在后台线程调用）"""
+        for session in sessions:
+            for index in range(self.steps):
+                key = self.key(session, index)
+                with self._lock:
+                    if key in self._frames:
+                        continue
+                image = self.render(session, index, self.steps, self.size)
+                with self._lock:
+                    self._frames[key] = image
+                    while len(self._frames) > self.max_frames:
+                        self._frames.popitem(last=False)
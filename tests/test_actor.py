@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""单一拥有者：并发命令下状态只由一个线程修改和推送"""
+
+import threading
+
+import pytest
+
+from benchmark import BenchConfig, actor_stress, quiet_effects
+from pomodoro_core import PomodoroTimer
+from pomodoro_scheduler import TimerScheduler
+
+def check(result):
+    assert result["errors"] == 0
+    assert result["emitting_threads"] == 1
+    assert result["mutating_threads"] == 1
+    assert result["peak_loop_threads"] <= 1
+    assert 1 <= result["seconds_counted_in_2s"] <= 3
+
+def test_concurrent_commands_have_single_owner():
+    check(actor_stress(senders=8, per_sender=300))
+
+def test_scheduler_runs_commands_on_its_thread():
+    scheduler = TimerScheduler()
+    scheduler.start()
+    try:
+        result = actor_stress(senders=8, per_sender=300, scheduler=scheduler)
+    finally:
+        scheduler.stop()
+    check(result)
+    assert result["peak_loop_threads"] == 0
+
+@pytest.mark.parametrize("use_scheduler", [False, True])
+def test_failing_callback_does_not_stop_the_countdown(use_scheduler):
+    scheduler = TimerScheduler() if use_scheduler else None
+    if scheduler is not None:
+        scheduler.start()
+    ended = threading.Event()
+    failures = [3]  # 前三次推送抛出异常
+
+    def callback(status):
+        if failures[0]:
+            failures[0] -= 1
+            raise RuntimeError("回调失败")
+        if status.session != "🍅 工作中":
+            ended.set()
+
+    timer = PomodoroTimer(BenchConfig(work_time=0.01), callback, scheduler=scheduler)
+    timer.effects = quiet_effects()
+    try:
+        timer.start()
+        assert ended.wait(5.0)  # 0.6 秒的工作会话照常结束
+        timer.pause()           # 阻塞命令仍由拥有者执行并返回
+        assert timer.is_paused
+    finally:
+        timer.close(timeout=2.0)
+        timer.effects.shutdown()
+        if scheduler is not None:
+            scheduler.stop()
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""计时推进路径不保留分配，状态快照和时间文本表复用"""
+
+import tracemalloc
+
+import pomodoro_core
+from benchmark import BenchConfig
+from pomodoro_core import PomodoroTimer, ensure_time_labels, time_label
+
+def running_timer(on_status=None):
+    now = [0.0]
+    timer = PomodoroTimer(BenchConfig(), on_status, clock=lambda: now[0])
+    timer.is_running = True
+    timer.reset_session()
+    timer.deadline = now[0] + timer._remaining
+    return timer, now
+
+def test_no_retained_allocations_per_tick():
+    emitted = [0]
+
+    def on_status(status):
+        emitted[0] += 1
+
+    timer, now = running_timer(on_status)
+    for _ in range(100):  # 预热
+        now[0] = timer._tick(now[0])
+
+    ticks = 1000  # 都在同一个 25 分钟会话之内
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        for _ in range(ticks):
+            now[0] = timer._tick(now[0])
+        retained = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    assert timer.current_session == 0 and emitted[0] >= ticks
+    assert retained < 1024, f"{ticks} 次推进保留了 {retained} B"
+
+def test_status_snapshot_is_reused():
+    timer, now = running_timer()
+    first = timer.get_status()
+    assert timer.get_status() is first
+    now[0] += 0.3  # 显示的秒数不变
+    assert timer.get_status() is first
+    now[0] += 1.0
+    assert timer.get_status() is not first
+
+def test_time_label_table_is_capped():
+    ensure_time_labels(10 ** 6)
+    assert len(pomodoro_core._time_labels) == pomodoro_core.TIME_LABEL_LIMIT + 1
+    assert time_label(59 * 60 + 1) is time_label(59 * 60 + 1)
+    assert time_label(10 ** 6) == "16666:40"
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""提示音：会话结束和结束前提醒在时限内交给输出端"""
+
+import threading
+import wave
+
+from benchmark import BenchConfig, quiet_effects
+from pomodoro_audio import AudioCues, NullSink, WavSink
+from pomodoro_core import PomodoroTimer
+
+LATENCY_LIMIT = 0.05  # 秒：触发到第一块样本写给输出端
+
+def run_two_sessions(sink):
+    """工作和短休息各 0.6 秒、结束前 0.3 秒提醒，返回播放器"""
+    config = BenchConfig(work_time=0.01, short_break=0.01, long_break=0.01, cycles=2,
+                         warning_seconds=0.3)
+    audio = AudioCues(sink)
+    done = threading.Event()
+    timer = PomodoroTimer(config, lambda status: audio.played >= 4 and done.set())
+    timer.effects = quiet_effects()
+    timer.audio = audio
+    timer.start()
+    try:
+        assert done.wait(5.0), audio.stats()
+    finally:
+        timer.close()
+        audio.close()
+        timer.effects.shutdown()
+    return audio
+
+def check_latency(audio):
+    assert audio.dropped == 0
+    assert len(audio.latencies) == audio.played
+    assert max(audio.latencies) < LATENCY_LIMIT, audio.stats()
+
+def test_cues_reach_null_sink_within_limit():
+    sink = NullSink()
+    audio = run_two_sessions(sink)
+    check_latency(audio)
+    cues = audio.cues
+    assert sink.frames >= (2 * cues["warning"].frames + cues["work_end"].frames
+                           + cues["break_end"].frames)
+
+def test_cues_written_to_wav_within_limit(tmp_path):
+    path = str(tmp_path / "cues.wav")
+    audio = run_two_sessions(WavSink(path))
+    check_latency(audio)
+    cues = audio.cues
+    with wave.open(path, "rb") as f:
+        pcm = f.readframes(f.getnframes())
+    # 依次为：工作提醒、工作结束、休息提醒、休息结束
+    expected = [cues[name].pcm for name in ("warning", "work_end", "warning", "break_end")]
+    assert pcm[:sum(map(len, expected))] == b"".join(expected)
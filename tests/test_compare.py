@@ -0,0 +1,15 @@
+# -*- coding: utf-8 -*-
+"""benchmark --compare：该平台无法测量的指标（None）不影响其余指标的对比"""
+
+import benchmark
+
+def test_compare_skips_non_numeric_values(capsys):
+    old = {"results": {"sync.idle_cpu_percent": None, "drift.avg_ms": 2.0}}
+    new = {"results": {"sync.idle_cpu_percent": None, "sync.cpu_ms_per_transition": None,
+                       "drift.avg_ms": 1.0, "simulation.reproducible": True}}
+    benchmark.compare(old, new)
+    lines = {line.split()[0]: line.split()[1:] for line in capsys.readouterr().out.splitlines()[2:]}
+    assert lines["sync.idle_cpu_percent"] == ["-", "-"]
+    assert lines["sync.cpu_ms_per_transition"] == ["-", "-"]
+    assert lines["drift.avg_ms"] == ["2.000", "1.000", "-50.0%"]
+    assert lines["simulation.reproducible"] == ["-", "True"]
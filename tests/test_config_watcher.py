@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+"""配置热加载：窗口隐藏时放宽检查间隔，恢复时立即检查"""
+
+import json
+import threading
+import time
+
+from pomodoro_core import ConfigWatcher, PomodoroConfig
+
+def write_config(**values):
+    with open("pomodoro_config.json", "w", encoding="utf-8") as f:
+        json.dump(values, f)
+
+def test_hidden_interval_defers_checks_until_restored(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write_config(work_time=25)
+    changed = threading.Event()
+    watcher = ConfigWatcher(PomodoroConfig(), lambda config: changed.set(), interval=0.05)
+    watcher.start()
+    try:
+        watcher.set_interval(60)
+        time.sleep(0.2)  # 等已经开始的短间隔等待结束
+        write_config(work_time=50)
+        assert not changed.wait(0.5)  # 隐藏时不再按短间隔检查
+
+        watcher.set_interval(watcher.default_interval)
+        assert changed.wait(1.0)
+        assert watcher.config.config["work_time"] == 50
+        assert watcher.reloads == 1
+    finally:
+        watcher.stop()
+        watcher._thread.join(1.0)
+    assert not watcher._thread.is_alive()
+
+def test_hidden_watcher_wakeups_per_hour():
+    import benchmark
+    result = benchmark.bench_refresh(quick=True)
+    assert result["refresh.visible_watcher_wakeups_per_hour"] == 1800
+    assert result["refresh.hidden_watcher_wakeups_per_hour"] == 60
+    assert result["refresh.hidden_total_wakeups_per_hour"] < 200
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""守护进程单实例：同时启动的两个实例只有一个运行"""
+
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from pomodoro_ctl import connect, request
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="需要 Unix 套接字")
+
+SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                      "pomodoro_daemon.py")
+
+def wait_for_socket(path, timeout=5.0):
+    give_up = time.monotonic() + timeout
+    while time.monotonic() < give_up:
+        try:
+            connect(path).close()
+            return True
+        except OSError:
+            time.sleep(0.05)
+    return False
+
+def test_concurrent_starts_leave_one_daemon(tmp_path):
+    path = str(tmp_path / "pomodoro.sock")
+    daemons = [subprocess.Popen([sys.executable, SCRIPT, "--socket", path], cwd=str(tmp_path),
+                                stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+               for _ in range(2)]
+    try:
+        assert wait_for_socket(path)
+        give_up = time.monotonic() + 5.0
+        while all(d.poll() is None for d in daemons) and time.monotonic() < give_up:
+            time.sleep(0.05)
+        exited = [d for d in daemons if d.poll() is not None]
+        assert len(exited) == 1
+        assert "已在运行" in exited[0].stdout.read().decode("utf-8")
+        assert request("status", path)["ok"]
+    finally:
+        for d in daemons:
+            if d.poll() is None:
+                d.terminate()
+                d.wait(5.0)
+            d.stdout.close()
+    assert not os.path.exists(path)
+
+def test_held_lock_stops_a_second_daemon_before_it_binds(tmp_path):
+    from pomodoro_daemon import acquire_instance_lock
+    path = str(tmp_path / "pomodoro.sock")
+    lock_file = acquire_instance_lock(path)  # 模拟另一个实例已加锁、尚未绑定套接字
+    try:
+        assert acquire_instance_lock(path) is None
+        result = subprocess.run([sys.executable, SCRIPT, "--socket", path], cwd=str(tmp_path),
+                                stdout=subprocess.PIPE, stderr=subprocess.STDOUT, timeout=10)
+        assert "已在运行" in result.stdout.decode("utf-8")
+        assert not os.path.exists(path)
+    finally:
+        lock_file.close()
+    relocked = acquire_instance_lock(path)
+    assert relocked is not None
+    relocked.close()
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""系统挂起后恢复：只处理刚结束的会话，不补发错过的会话"""
+
+import asyncio
+import threading
+import time
+
+import pomodoro_async
+import pomodoro_core
+from benchmark import BenchConfig, quiet_effects
+from pomodoro_async import SESSION_COMPLETE, AsyncPomodoroTimer
+from pomodoro_core import PomodoroTimer
+from pomodoro_sim import Simulation
+
+class RecordingHistory:
+    def __init__(self):
+        self.records = []
+
+    def record(self, **fields):
+        self.records.append(fields)
+
+def suspend(sim, seconds):
+    """模拟挂起：时钟直接前跳，期间没有任何唤醒"""
+    sim.clock.advance_to(sim.clock() + seconds)
+
+def test_long_suspend_fires_one_session_end():
+    history = RecordingHistory()
+    sim = Simulation(BenchConfig(auto_lock=True), history=history)
+    sim.at(0, "start")
+    sim.run_for(60)
+    suspend(sim, 8 * 3600)
+    sim.run_for(1)
+
+    effects = [e.detail[0] for e in sim.trace if e.kind == "effect"]
+    assert effects.count("notify") == 1
+    assert effects.count("lock") == 1
+    assert [r["completed"] for r in history.records] == [True]
+
+    timer = sim.timer
+    slot = timer.timeline().slot_at(60 + 8 * 3600 + 1)
+    assert (timer.current_session, timer.current_cycle) == (slot.session, slot.cycle)
+    assert abs(timer._precise_remaining() - (slot.end - (60 + 8 * 3600 + 1))) < 1e-6
+
+def test_short_suspend_keeps_chained_deadline():
+    sim = Simulation(BenchConfig())
+    sim.at(0, "start")
+    sim.run_for(24 * 60)
+    suspend(sim, 2 * 60)  # 工作在挂起期间结束，但短休息还没结束
+    sim.run_for(0)
+    timer = sim.timer
+    assert timer.current_session == 1
+    assert abs(timer._precise_remaining() - 4 * 60) < 1e-6
+
+class SuspendableClock:
+    """包含挂起时间的时钟；等待用的超时不受它影响，就像真实挂起时一样"""
+    def __init__(self):
+        self.offset = 0.0
+
+    def __call__(self):
+        return time.monotonic() + self.offset
+
+QUIET = 24 * 3600  # 只在会话结束时唤醒（同步服务的刷新粒度）
+
+def test_threaded_wait_rechecks_clock_after_suspend(monkeypatch):
+    monkeypatch.setattr(pomodoro_core, "MAX_WAIT", 0.1)
+    clock = SuspendableClock()
+    ended = threading.Event()
+    timer = PomodoroTimer(BenchConfig(work_time=1), clock=clock)
+    timer.callback = lambda status: status.session != "🍅 工作中" and ended.set()
+    timer.effects = quiet_effects()
+    timer.refresh_granularity = QUIET
+    timer.start()
+    try:
+        clock.offset += 61  # 挂起 61 秒，计时线程仍在按 60 秒的超时等待
+        assert ended.wait(2.0)
+    finally:
+        timer.close()
+        timer.effects.shutdown()
+
+def test_async_wait_rechecks_clock_after_suspend(monkeypatch):
+    monkeypatch.setattr(pomodoro_async, "MAX_WAIT", 0.1)
+    clock = SuspendableClock()
+
+    async def run():
+        timer = AsyncPomodoroTimer(BenchConfig(work_time=1), clock=clock)
+        timer.effects = quiet_effects()
+        timer.refresh_granularity = QUIET
+        timer.start()
+        clock.offset += 61
+        try:
+            while True:
+                event = await asyncio.wait_for(timer.next_event(), 2.0)
+                if event.kind == SESSION_COMPLETE:
+                    return event.finished_session
+        finally:
+            timer.stop()
+            timer.effects.shutdown()
+
+    assert asyncio.run(run()) == 0
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+"""会话时间线与自定义序列"""
+
+from benchmark import BenchConfig
+from pomodoro_sim import Simulation
+
+CUSTOM = ["work", "short_break", "short_break", "work", "long_break"]
+NAMES = {"work": "工作", "short_break": "短休息", "long_break": "长休息"}
+
+def ended_sessions(sim):
+    """轨迹中按时间顺序结束的会话名"""
+    return [e.detail[2][:-len("时间结束！")] for e in sim.trace
+            if e.kind == "effect" and e.detail[0] == "notify"]
+
+def test_custom_sequence_runs_end_to_end():
+    # 一轮 25+5+5+25+15 = 75 分钟，跑两轮
+    sim = Simulation(BenchConfig(sequence=CUSTOM))
+    sim.at(0, "start")
+    sim.run_for(2 * 75 * 60)
+    assert ended_sessions(sim) == [NAMES[name] for name in CUSTOM] * 2
+
+def test_skip_follows_position_in_custom_sequence():
+    sim = Simulation(BenchConfig(sequence=CUSTOM))
+    sim.at(0, "start")
+    for i in range(1, 6):
+        sim.at(i, "skip")
+    sim.run_for(10)
+    timer = sim.timer
+    assert (timer.current_session, timer.current_cycle) == (0, 0)
+    timer.skip(2)
+    timer.skip(1)
+    assert timer.current_session == 0  # 第二个短休息之后是工作，而不是再一次短休息
+
+def test_total_cycles_follows_custom_sequence():
+    sim = Simulation(BenchConfig(sequence=["work", "short_break", "work", "long_break"]))
+    sim.at(0, "start")
+    sim.run_for((25 + 5 + 25) * 60 + 1)  # 进入长休息
+    status = sim.timer.get_status()
+    assert (status.session, status.cycle, status.total_cycles) == ("🛌 长休息", 2, 2)
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""界面更新管线：其他线程只投递请求，释放界面后状态不会被永久合并"""
+
+import threading
+
+from benchmark import BenchConfig, HeadlessLabel
+from pomodoro_core import PomodoroTimer
+from pomodoro_gui import PomodoroApp
+
+class FakeRoot:
+    """记录调用线程和调用的 Tk 根窗口替身"""
+    def __init__(self):
+        self.threads = set()
+        self.calls = []
+        self.destroyed = False
+
+    def __getattr__(self, name):
+        def call(*args, **kwargs):
+            self.threads.add(threading.get_ident())
+            self.calls.append((name, args, kwargs))
+            if name == "destroy":
+                self.destroyed = True
+        return call
+
+def make_app(release_after=None):
+    config = BenchConfig()
+    app = PomodoroApp.__new__(PomodoroApp)
+    app.config = config
+    app.timer = PomodoroTimer(config, app.update_display)
+    app._init_ui_pipeline()
+    app.release_after = release_after
+    app.root = FakeRoot()
+    app.config_window = None
+    app._release_at = None
+    app._quitting = False
+    app.status_label = HeadlessLabel()
+    app.time_label = HeadlessLabel()
+    app.cycle_label = HeadlessLabel()
+    app.start_button = HeadlessLabel()
+    return app
+
+def test_updates_from_other_threads_never_touch_tk():
+    app = make_app()
+    status = app.timer.get_status()._replace(remaining_time=61)
+    sender = threading.Thread(target=app.update_display, args=(status,))
+    sender.start()
+    sender.join()
+
+    assert app.root.threads == set()
+    assert app.time_label.text == ""
+    app._drain_ui_requests()
+    assert app.time_label.text == "01:01"
+
+def test_release_does_not_leave_status_pending():
+    app = make_app(release_after=0)
+    app.enter_low_power = lambda: setattr(app, "window_visible", False)
+    app.hide_window()
+    app.update_display(app.timer.get_status())
+
+    app._wait_ui_request()  # 执行排队的刷新
+    app._wait_ui_request()  # 队列已空，到达释放时刻
+    assert app.root is None
+    assert app._pending_status is None
+
+    app.update_display(app.timer.get_status()._replace(remaining_time=5))
+    app.update_display(app.timer.get_status()._replace(remaining_time=4))
+    assert app.ui_stats["coalesced"] == 1
+    app._drain_ui_requests()
+    assert app._pending_status is None
+    app.update_display(app.timer.get_status())
+    assert app.ui_stats["coalesced"] == 1  # 释放后的新状态重新排队，而不是一直被合并
+
+def test_requests_wake_the_tk_loop_only_while_it_runs():
+    app = make_app()
+    app._on_ui_thread(lambda: None)
+    assert app.root.calls == []  # 主线程阻塞在队列上，不需要 Tk 事件
+
+    app._tk_loop_running = True
+    sender = threading.Thread(target=app._on_ui_thread, args=(lambda: None,))
+    sender.start()
+    sender.join()
+    assert app.root.calls == [("event_generate", ("<<UiRequest>>",), {"when": "tail"})]
+    assert app._ui_requests.qsize() == 2